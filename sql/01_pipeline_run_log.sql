@@ -7,3 +7,7 @@ CREATE TABLE IF NOT EXISTS gold.pipeline_run_log (
     error_message TEXT,
     executed_at TIMESTAMPTZ DEFAULT now()
 );
+
+-- Latest-run lookups (dashboard cache version, recent runs table)
+CREATE INDEX IF NOT EXISTS pipeline_run_log_executed_at_idx
+  ON gold.pipeline_run_log (executed_at DESC);
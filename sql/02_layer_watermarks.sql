@@ -0,0 +1,6 @@
+-- High-water marks for incremental layers (max bronze INGESTED_AT already processed)
+CREATE TABLE IF NOT EXISTS gold.layer_watermarks (
+    name TEXT PRIMARY KEY,
+    watermark TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
@@ -0,0 +1,160 @@
+CREATE SCHEMA IF NOT EXISTS bronze;
+
+-- Explicitly typed, unlogged staging table filled by COPY in src/ingest_bronze.py.
+-- Truncated at the start of every load; never read by downstream layers.
+CREATE UNLOGGED TABLE IF NOT EXISTS bronze.player_game_logs_stage (
+    "SEASON_ID"         TEXT,
+    "PLAYER_ID"         BIGINT,
+    "PLAYER_NAME"       TEXT,
+    "TEAM_ID"           BIGINT,
+    "TEAM_ABBREVIATION" TEXT,
+    "TEAM_NAME"         TEXT,
+    "GAME_ID"           TEXT,
+    "GAME_DATE"         TEXT,
+    "MATCHUP"           TEXT,
+    "WL"                TEXT,
+    "MIN"               DOUBLE PRECISION,
+    "FGM"               DOUBLE PRECISION,
+    "FGA"               DOUBLE PRECISION,
+    "FG_PCT"            DOUBLE PRECISION,
+    "FG3M"              DOUBLE PRECISION,
+    "FG3A"              DOUBLE PRECISION,
+    "FG3_PCT"           DOUBLE PRECISION,
+    "FTM"               DOUBLE PRECISION,
+    "FTA"               DOUBLE PRECISION,
+    "FT_PCT"            DOUBLE PRECISION,
+    "OREB"              DOUBLE PRECISION,
+    "DREB"              DOUBLE PRECISION,
+    "REB"               DOUBLE PRECISION,
+    "AST"               DOUBLE PRECISION,
+    "STL"               DOUBLE PRECISION,
+    "BLK"               DOUBLE PRECISION,
+    "TOV"               DOUBLE PRECISION,
+    "PF"                DOUBLE PRECISION,
+    "PTS"               DOUBLE PRECISION,
+    "PLUS_MINUS"        DOUBLE PRECISION,
+    "FANTASY_PTS"       DOUBLE PRECISION,
+    "VIDEO_AVAILABLE"   DOUBLE PRECISION,
+    "SEASON"            TEXT,
+    "INGESTED_AT"       TIMESTAMPTZ
+);
+
+-- Permanent bronze table, LIST-partitioned by season (one partition per season,
+-- created on demand by bronze.ensure_season_partition). Upserts go straight to
+-- the season's partition and season filters prune to it; closed seasons can be
+-- frozen or archived with src/bronze_partitions.py.
+
+-- Deployments before partitioning have a plain table: move it aside here, its
+-- rows are copied into season partitions below.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'bronze'
+          AND c.relname = 'player_game_logs'
+          AND c.relkind = 'r'
+    ) THEN
+        -- recreated by src/run_silver.py
+        DROP VIEW IF EXISTS silver.player_game_logs_v;
+        ALTER TABLE bronze.player_game_logs RENAME TO player_game_logs_unpartitioned;
+        IF EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'bronze_game_logs_unique') THEN
+            ALTER TABLE bronze.player_game_logs_unpartitioned
+            RENAME CONSTRAINT bronze_game_logs_unique TO bronze_game_logs_unpartitioned_unique;
+        END IF;
+        DROP INDEX IF EXISTS bronze.bronze_game_logs_ingested_at_idx;
+    END IF;
+END$$;
+
+CREATE TABLE IF NOT EXISTS bronze.player_game_logs (
+    LIKE bronze.player_game_logs_stage,
+    CONSTRAINT bronze_game_logs_unique UNIQUE ("SEASON","GAME_ID","PLAYER_ID")
+) PARTITION BY LIST ("SEASON");
+
+-- md5 of the stat payload, set by the upsert in src/ingest_bronze.py. Rows are
+-- only rewritten (and INGESTED_AT only moves) when it changes.
+ALTER TABLE bronze.player_game_logs ADD COLUMN IF NOT EXISTS "ROW_HASH" TEXT;
+
+-- Incremental silver/gold stages scan bronze by INGESTED_AT watermark
+-- (created on every partition)
+CREATE INDEX IF NOT EXISTS bronze_game_logs_ingested_at_idx
+    ON bronze.player_game_logs ("INGESTED_AT");
+
+-- Returns the partition for `season`, creating it if needed
+-- ("2024-25" -> bronze.player_game_logs_2024_25)
+CREATE OR REPLACE FUNCTION bronze.ensure_season_partition(season TEXT)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    part TEXT := 'player_game_logs_' || lower(regexp_replace(season, '[^0-9A-Za-z]+', '_', 'g'));
+BEGIN
+    IF to_regclass(format('bronze.%I', part)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE bronze.%I PARTITION OF bronze.player_game_logs FOR VALUES IN (%L)',
+            part, season
+        );
+    END IF;
+    RETURN part;
+END$$;
+
+DO $$
+DECLARE
+    s TEXT;
+BEGIN
+    IF to_regclass('bronze.player_game_logs_unpartitioned') IS NOT NULL THEN
+        FOR s IN
+            SELECT DISTINCT "SEASON" FROM bronze.player_game_logs_unpartitioned
+            WHERE "SEASON" IS NOT NULL
+        LOOP
+            PERFORM bronze.ensure_season_partition(s);
+        END LOOP;
+
+        INSERT INTO bronze.player_game_logs (
+            "SEASON_ID", "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION",
+            "TEAM_NAME", "GAME_ID", "GAME_DATE", "MATCHUP", "WL", "MIN", "FGM", "FGA",
+            "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT", "OREB", "DREB",
+            "REB", "AST", "STL", "BLK", "TOV", "PF", "PTS", "PLUS_MINUS", "FANTASY_PTS",
+            "VIDEO_AVAILABLE", "SEASON", "INGESTED_AT"
+        )
+        SELECT
+            "SEASON_ID", "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION",
+            "TEAM_NAME", "GAME_ID", "GAME_DATE", "MATCHUP", "WL", "MIN", "FGM", "FGA",
+            "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT", "OREB", "DREB",
+            "REB", "AST", "STL", "BLK", "TOV", "PF", "PTS", "PLUS_MINUS", "FANTASY_PTS",
+            "VIDEO_AVAILABLE", "SEASON", "INGESTED_AT"
+        FROM bronze.player_game_logs_unpartitioned
+        WHERE "SEASON" IS NOT NULL
+        ON CONFLICT DO NOTHING;
+
+        DROP TABLE bronze.player_game_logs_unpartitioned;
+    END IF;
+END$$;
+
+-- Stat corrections: re-fetched rows whose payload differs from what bronze held
+CREATE TABLE IF NOT EXISTS bronze.player_game_log_corrections (
+    "SEASON"          TEXT NOT NULL,
+    "GAME_ID"         TEXT NOT NULL,
+    "PLAYER_ID"       BIGINT NOT NULL,
+    detected_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    old_hash          TEXT,
+    new_hash          TEXT,
+    changed_columns   TEXT[],
+    old_values        JSONB,
+    new_values        JSONB
+);
+
+CREATE INDEX IF NOT EXISTS bronze_corrections_key_idx
+    ON bronze.player_game_log_corrections ("SEASON", "GAME_ID", "PLAYER_ID");
+
+-- Windows whose fetch exhausted its retries; incremental runs fetch them again
+-- until a run loads them (src/ingest_bronze.py)
+CREATE TABLE IF NOT EXISTS bronze.failed_windows (
+    "SEASON"        TEXT NOT NULL,
+    date_from       DATE NOT NULL,
+    date_to         DATE NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 1,
+    last_failed_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY ("SEASON", date_from, date_to)
+);
@@ -0,0 +1,23 @@
+-- Per-run column profiles from the sampled quality mode (src/profiling.py)
+CREATE TABLE IF NOT EXISTS gold.quality_profiles (
+    run_id            UUID NOT NULL,
+    profiled_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    table_name        TEXT NOT NULL,
+    column_name       TEXT NOT NULL,
+    sample_rows       BIGINT,
+    null_rate         DOUBLE PRECISION,
+    distinct_estimate DOUBLE PRECISION,
+    min_value         TEXT,
+    max_value         TEXT,
+    mean              DOUBLE PRECISION,
+    p05               DOUBLE PRECISION,
+    p25               DOUBLE PRECISION,
+    p50               DOUBLE PRECISION,
+    p75               DOUBLE PRECISION,
+    p95               DOUBLE PRECISION,
+    shift_flags       TEXT[],
+    PRIMARY KEY (run_id, table_name, column_name)
+);
+
+CREATE INDEX IF NOT EXISTS quality_profiles_table_time_idx
+    ON gold.quality_profiles (table_name, profiled_at DESC);
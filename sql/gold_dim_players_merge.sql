@@ -0,0 +1,41 @@
+-- sql/gold_dim_players_merge.sql
+-- Upserts gold.dim_players for players with silver rows ingested in (:low, :high].
+-- Name and team come from the player's most recent game.
+WITH delta_players AS (
+  SELECT DISTINCT player_id
+  FROM silver.player_game_logs
+  WHERE ingested_at > :low AND ingested_at <= :high
+),
+history AS (
+  SELECT s.player_id, s.player_name, s.team, s.game_date
+  FROM silver.player_game_logs s
+  JOIN delta_players d USING (player_id)
+),
+latest AS (
+  SELECT DISTINCT ON (player_id) player_id, player_name, team
+  FROM history
+  ORDER BY player_id, game_date DESC NULLS LAST
+),
+totals AS (
+  SELECT
+    player_id,
+    min(game_date) AS first_game_date,
+    max(game_date) AS last_game_date,
+    count(*)       AS games
+  FROM history
+  GROUP BY player_id
+)
+INSERT INTO gold.dim_players (
+  player_id, player_name, team, first_game_date, last_game_date, games, refreshed_at
+)
+SELECT
+  l.player_id, l.player_name, l.team, t.first_game_date, t.last_game_date, t.games, now()
+FROM latest l
+JOIN totals t USING (player_id)
+ON CONFLICT (player_id) DO UPDATE SET
+  player_name     = EXCLUDED.player_name,
+  team            = EXCLUDED.team,
+  first_game_date = EXCLUDED.first_game_date,
+  last_game_date  = EXCLUDED.last_game_date,
+  games           = EXCLUDED.games,
+  refreshed_at    = EXCLUDED.refreshed_at;
@@ -1,17 +1,32 @@
 CREATE SCHEMA IF NOT EXISTS gold;
 
 -- 1) Opponent allowed stats per season (what teams allow to opponents)
+-- Running totals per (season, team), updated by src/run_gold.py from newly
+-- ingested rows only (sql/gold_opponent_season_totals_merge.sql).
+-- player_rows = opposing box-score rows counted.
+CREATE TABLE IF NOT EXISTS gold.opponent_season_totals (
+  season       TEXT NOT NULL,
+  team         TEXT NOT NULL,
+  games        INTEGER,
+  player_rows  INTEGER,
+  pts          DOUBLE PRECISION,
+  reb          DOUBLE PRECISION,
+  ast          DOUBLE PRECISION,
+  refreshed_at TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (season, team)
+);
+
 CREATE OR REPLACE VIEW gold.opponent_allowed AS
 SELECT
   season,
-  opponent_team AS team,
-  avg(pts) AS opp_pts_allowed,
-  avg(reb) AS opp_reb_allowed,
-  avg(ast) AS opp_ast_allowed
-FROM silver.player_game_logs
-GROUP BY 1,2;
+  team,
+  pts / player_rows AS opp_pts_allowed,
+  reb / player_rows AS opp_reb_allowed,
+  ast / player_rows AS opp_ast_allowed
+FROM gold.opponent_season_totals
+WHERE player_rows > 0;
 
--- 2) Ranks (1 = toughest defense, lowest allowed)
+-- 2) Ranks (1 = toughest defense, lowest allowed), over ~30 rows per season
 CREATE OR REPLACE VIEW gold.opponent_ranks AS
 SELECT
   season,
@@ -25,52 +40,101 @@ SELECT
 FROM gold.opponent_allowed;
 
 -- 3) Player features + next-game target
-CREATE OR REPLACE VIEW gold.player_features AS
-SELECT
-  p.season,
-  p.game_id,
-  p.game_date,
-  p.player_id,
-  p.player_name,
-  p.team,
-  p.opponent_team,
-  p.minutes,
-  p.pts,
-  p.reb,
-  p.ast,
+-- Materialized table maintained incrementally by src/run_gold.py
+-- (see sql/gold_player_features_merge.sql). Older deployments had a view here.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.views
+        WHERE table_schema = 'gold' AND table_name = 'player_features'
+    ) THEN
+        DROP VIEW gold.player_features;
+    END IF;
+END$$;
+
+CREATE TABLE IF NOT EXISTS gold.player_features (
+  season               TEXT NOT NULL,
+  game_id              TEXT NOT NULL,
+  game_date            DATE,
+  player_id            BIGINT NOT NULL,
+  player_name          TEXT,
+  team                 TEXT,
+  opponent_team        TEXT,
+  minutes              DOUBLE PRECISION,
+  pts                  DOUBLE PRECISION,
+  reb                  DOUBLE PRECISION,
+  ast                  DOUBLE PRECISION,
+  pts_last3            DOUBLE PRECISION,
+  reb_last3            DOUBLE PRECISION,
+  ast_last3            DOUBLE PRECISION,
+  min_last3            DOUBLE PRECISION,
+  pts_next_game        DOUBLE PRECISION,
+  opp_pts_allowed_rank BIGINT,
+  opp_reb_allowed_rank BIGINT,
+  opp_ast_allowed_rank BIGINT,
+  ingested_at          TIMESTAMPTZ,
+  refreshed_at         TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (season, game_id, player_id)
+);
+
+-- Dashboard lookups (one player, most recent games first)
+CREATE INDEX IF NOT EXISTS player_features_player_name_date_idx
+  ON gold.player_features (player_name, game_date DESC);
+
+-- Dashboard history pages: keyset on (game_date, game_id) per player
+DROP INDEX IF EXISTS gold.player_features_player_id_date_idx;
+CREATE INDEX IF NOT EXISTS player_features_player_id_date_game_idx
+  ON gold.player_features (player_id, game_date, game_id);
 
-  avg(p.pts) OVER (
-    PARTITION BY p.player_id
-    ORDER BY p.game_date
-    ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-  ) AS pts_last3,
+-- Incremental quality checks (src/check_quality.py) scan rows refreshed since the last pass
+CREATE INDEX IF NOT EXISTS player_features_refreshed_at_idx
+  ON gold.player_features (refreshed_at);
 
-  avg(p.reb) OVER (
-    PARTITION BY p.player_id
-    ORDER BY p.game_date
-    ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-  ) AS reb_last3,
+-- 4) Player dimension (one row per player) for the dashboard's player picker.
+-- Maintained incrementally by src/run_gold.py (see sql/gold_dim_players_merge.sql).
+CREATE TABLE IF NOT EXISTS gold.dim_players (
+  player_id       BIGINT PRIMARY KEY,
+  player_name     TEXT,
+  team            TEXT,
+  first_game_date DATE,
+  last_game_date  DATE,
+  games           INTEGER,
+  refreshed_at    TIMESTAMPTZ DEFAULT now()
+);
 
-  avg(p.ast) OVER (
-    PARTITION BY p.player_id
-    ORDER BY p.game_date
-    ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-  ) AS ast_last3,
+CREATE INDEX IF NOT EXISTS dim_players_player_name_idx
+  ON gold.dim_players (player_name);
 
-  avg(p.minutes) OVER (
-    PARTITION BY p.player_id
-    ORDER BY p.game_date
-    ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
-  ) AS min_last3,
+-- 5) Rollups for league-wide dashboard views. Each row is recomputed from silver
+-- by src/run_gold.py whenever its group gets new rows (sql/gold_*_merge.sql).
+CREATE TABLE IF NOT EXISTS gold.team_game_totals (
+  season        TEXT NOT NULL,
+  team          TEXT NOT NULL,
+  game_date     DATE NOT NULL,
+  game_id       TEXT,
+  opponent_team TEXT,
+  players       INTEGER,
+  minutes       DOUBLE PRECISION,
+  pts           DOUBLE PRECISION,
+  reb           DOUBLE PRECISION,
+  ast           DOUBLE PRECISION,
+  refreshed_at  TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (season, team, game_date)
+);
 
-  lead(p.pts) OVER (
-    PARTITION BY p.player_id
-    ORDER BY p.game_date
-  ) AS pts_next_game,
+CREATE TABLE IF NOT EXISTS gold.player_season_totals (
+  season       TEXT NOT NULL,
+  player_id    BIGINT NOT NULL,
+  player_name  TEXT,
+  team         TEXT,
+  games        INTEGER,
+  minutes      DOUBLE PRECISION,
+  pts          DOUBLE PRECISION,
+  reb          DOUBLE PRECISION,
+  ast          DOUBLE PRECISION,
+  refreshed_at TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (season, player_id)
+);
 
-  r.opp_pts_allowed_rank,
-  r.opp_reb_allowed_rank,
-  r.opp_ast_allowed_rank
-FROM silver.player_game_logs p
-LEFT JOIN gold.opponent_ranks r
-  ON r.season = p.season AND r.team = p.opponent_team;
\ No newline at end of file
+-- Point-in-time opponent ranks are computed in Python (src/asof_ranks.py)
+DROP VIEW IF EXISTS gold.opponent_ranks_asof;
@@ -0,0 +1,101 @@
+-- sql/gold_opponent_season_totals_merge.sql
+-- Adds silver rows ingested in (:low, :high] to the running totals in
+-- gold.opponent_season_totals. Runs before the gold.player_features merge, whose
+-- rows still hold the values each re-ingested box score was last counted with;
+-- those are subtracted, so corrections and re-fetched rows are not double counted.
+WITH delta AS (
+  SELECT season, game_id, player_id, opponent_team, pts, reb, ast
+  FROM silver.player_game_logs
+  WHERE ingested_at > :low AND ingested_at <= :high
+    -- same rows the features merge writes
+    AND game_date IS NOT NULL
+),
+
+changes AS (
+  SELECT
+    season,
+    opponent_team     AS team,
+    1                 AS player_rows,
+    coalesce(pts, 0)  AS pts,
+    coalesce(reb, 0)  AS reb,
+    coalesce(ast, 0)  AS ast
+  FROM delta
+  UNION ALL
+  SELECT
+    f.season,
+    f.opponent_team,
+    -1,
+    -coalesce(f.pts, 0),
+    -coalesce(f.reb, 0),
+    -coalesce(f.ast, 0)
+  FROM gold.player_features f
+  JOIN delta d USING (season, game_id, player_id)
+),
+
+-- games = distinct games per (season, team). Compare, for every game the delta
+-- touches, which teams were counted for it before and after the delta, so a
+-- corrected row that moves to another opponent moves its game too.
+delta_games AS (
+  SELECT DISTINCT season, game_id
+  FROM delta
+),
+
+games_before AS (
+  SELECT DISTINCT f.season, f.opponent_team AS team, f.game_id
+  FROM gold.player_features f
+  JOIN delta_games USING (season, game_id)
+  WHERE f.opponent_team IS NOT NULL
+),
+
+games_after AS (
+  SELECT DISTINCT season, team, game_id
+  FROM (
+    SELECT f.season, f.opponent_team AS team, f.game_id
+    FROM gold.player_features f
+    JOIN delta_games USING (season, game_id)
+    LEFT JOIN delta d USING (season, game_id, player_id)
+    WHERE d.player_id IS NULL
+    UNION ALL
+    SELECT season, opponent_team, game_id
+    FROM delta
+  ) g
+  WHERE team IS NOT NULL
+),
+
+game_changes AS (
+  SELECT season, team, sum(n) AS games
+  FROM (
+    SELECT season, team, 1 AS n FROM games_after
+    UNION ALL
+    SELECT season, team, -1 FROM games_before
+  ) g
+  GROUP BY season, team
+),
+
+summed AS (
+  SELECT
+    season,
+    team,
+    sum(player_rows) AS player_rows,
+    sum(pts)         AS pts,
+    sum(reb)         AS reb,
+    sum(ast)         AS ast
+  FROM changes
+  WHERE team IS NOT NULL
+  GROUP BY season, team
+)
+
+INSERT INTO gold.opponent_season_totals AS t (
+  season, team, games, player_rows, pts, reb, ast, refreshed_at
+)
+SELECT
+  s.season, s.team, coalesce(g.games, 0), s.player_rows, s.pts, s.reb, s.ast, now()
+FROM summed s
+LEFT JOIN game_changes g USING (season, team)
+ON CONFLICT (season, team) DO UPDATE SET
+  games        = t.games + EXCLUDED.games,
+  player_rows  = t.player_rows + EXCLUDED.player_rows,
+  pts          = t.pts + EXCLUDED.pts,
+  reb          = t.reb + EXCLUDED.reb,
+  ast          = t.ast + EXCLUDED.ast,
+  refreshed_at = EXCLUDED.refreshed_at;
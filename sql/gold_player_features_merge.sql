@@ -0,0 +1,67 @@
+-- Incremental refresh of gold.player_features.
+-- :low / :high bound the delta on bronze INGESTED_AT. Only players with new games
+-- are re-read, and only their rows from the game before the first new one onward
+-- are rewritten: that game's pts_next_game changes and the following games'
+-- rolling windows now include the new row.
+-- The rolling_* placeholders are filled from GOLD_FEATURES in src/feature_specs.py.
+WITH delta_players AS (
+  SELECT
+    player_id,
+    min(game_date) AS first_new_date
+  FROM silver.player_game_logs
+  WHERE ingested_at > :low
+    AND ingested_at <= :high
+  GROUP BY player_id
+),
+
+computed AS (
+  SELECT
+    p.season,
+    p.game_id,
+    p.game_date,
+    p.player_id,
+    p.player_name,
+    p.team,
+    p.opponent_team,
+    p.minutes,
+    p.pts,
+    p.reb,
+    p.ast,
+    {rolling_expressions},
+    lead(p.pts) OVER by_date AS pts_next_game,
+    lead(p.game_date) OVER by_date AS next_game_date,
+    p.ingested_at,
+    d.first_new_date
+  FROM silver.player_game_logs p
+  JOIN delta_players d
+    ON d.player_id = p.player_id
+  WINDOW by_date AS (PARTITION BY p.player_id ORDER BY p.game_date)
+)
+
+INSERT INTO gold.player_features (
+  season, game_id, game_date, player_id, player_name, team, opponent_team,
+  minutes, pts, reb, ast,
+  {rolling_columns},
+  pts_next_game, ingested_at, refreshed_at
+)
+SELECT
+  season, game_id, game_date, player_id, player_name, team, opponent_team,
+  minutes, pts, reb, ast,
+  {rolling_columns},
+  pts_next_game, ingested_at, now()
+FROM computed
+WHERE coalesce(next_game_date, game_date) >= first_new_date
+ON CONFLICT (season, game_id, player_id)
+DO UPDATE SET
+  game_date     = EXCLUDED.game_date,
+  player_name   = EXCLUDED.player_name,
+  team          = EXCLUDED.team,
+  opponent_team = EXCLUDED.opponent_team,
+  minutes       = EXCLUDED.minutes,
+  pts           = EXCLUDED.pts,
+  reb           = EXCLUDED.reb,
+  ast           = EXCLUDED.ast,
+  {rolling_updates},
+  pts_next_game = EXCLUDED.pts_next_game,
+  ingested_at   = EXCLUDED.ingested_at,
+  refreshed_at  = EXCLUDED.refreshed_at;
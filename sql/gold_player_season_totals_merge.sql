@@ -0,0 +1,46 @@
+-- sql/gold_player_season_totals_merge.sql
+-- Recomputes gold.player_season_totals for (season, player_id) groups with
+-- silver rows ingested in (:low, :high]. Name and team come from the latest game.
+WITH delta AS (
+  SELECT DISTINCT season, player_id
+  FROM silver.player_game_logs
+  WHERE ingested_at > :low AND ingested_at <= :high
+),
+history AS (
+  SELECT s.*
+  FROM silver.player_game_logs s
+  JOIN delta d USING (season, player_id)
+),
+latest AS (
+  SELECT DISTINCT ON (season, player_id) season, player_id, player_name, team
+  FROM history
+  ORDER BY season, player_id, game_date DESC NULLS LAST
+),
+totals AS (
+  SELECT
+    season,
+    player_id,
+    count(*)     AS games,
+    sum(minutes) AS minutes,
+    sum(pts)     AS pts,
+    sum(reb)     AS reb,
+    sum(ast)     AS ast
+  FROM history
+  GROUP BY season, player_id
+)
+INSERT INTO gold.player_season_totals (
+  season, player_id, player_name, team, games, minutes, pts, reb, ast, refreshed_at
+)
+SELECT
+  t.season, t.player_id, l.player_name, l.team, t.games, t.minutes, t.pts, t.reb, t.ast, now()
+FROM totals t
+JOIN latest l USING (season, player_id)
+ON CONFLICT (season, player_id) DO UPDATE SET
+  player_name  = EXCLUDED.player_name,
+  team         = EXCLUDED.team,
+  games        = EXCLUDED.games,
+  minutes      = EXCLUDED.minutes,
+  pts          = EXCLUDED.pts,
+  reb          = EXCLUDED.reb,
+  ast          = EXCLUDED.ast,
+  refreshed_at = EXCLUDED.refreshed_at;
@@ -0,0 +1,37 @@
+-- sql/gold_team_game_totals_merge.sql
+-- Recomputes gold.team_game_totals for (season, team, game_date) groups with
+-- silver rows ingested in (:low, :high].
+WITH delta AS (
+  SELECT DISTINCT season, team, game_date
+  FROM silver.player_game_logs
+  WHERE ingested_at > :low AND ingested_at <= :high
+    AND team IS NOT NULL
+    AND game_date IS NOT NULL
+)
+INSERT INTO gold.team_game_totals (
+  season, team, game_date, game_id, opponent_team, players, minutes, pts, reb, ast, refreshed_at
+)
+SELECT
+  s.season,
+  s.team,
+  s.game_date,
+  min(s.game_id),
+  min(s.opponent_team),
+  count(*),
+  sum(s.minutes),
+  sum(s.pts),
+  sum(s.reb),
+  sum(s.ast),
+  now()
+FROM silver.player_game_logs s
+JOIN delta d USING (season, team, game_date)
+GROUP BY s.season, s.team, s.game_date
+ON CONFLICT (season, team, game_date) DO UPDATE SET
+  game_id       = EXCLUDED.game_id,
+  opponent_team = EXCLUDED.opponent_team,
+  players       = EXCLUDED.players,
+  minutes       = EXCLUDED.minutes,
+  pts           = EXCLUDED.pts,
+  reb           = EXCLUDED.reb,
+  ast           = EXCLUDED.ast,
+  refreshed_at  = EXCLUDED.refreshed_at;
@@ -1,8 +1,9 @@
 -- sql/silver_player_game_logs.sql
 CREATE SCHEMA IF NOT EXISTS silver;
 
--- Silver is a cleaned, standardized view over bronze
-CREATE OR REPLACE VIEW silver.player_game_logs AS
+-- Cleaned, standardized view over bronze. Kept as a compatibility shim and as the
+-- source for the typed silver.player_game_logs table below.
+CREATE OR REPLACE VIEW silver.player_game_logs_v AS
 SELECT
   "SEASON"                      AS season,
   "GAME_ID"                     AS game_id,
@@ -26,3 +27,52 @@ SELECT
   "TOV"::float                  AS tov,
   "INGESTED_AT"::timestamptz    AS ingested_at
 FROM bronze.player_game_logs;
+
+-- silver.player_game_logs used to be the view above. Gold views built on it are
+-- recreated by src/run_gold.py.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.views
+        WHERE table_schema = 'silver' AND table_name = 'player_game_logs'
+    ) THEN
+        DROP VIEW silver.player_game_logs CASCADE;
+    END IF;
+END$$;
+
+-- Physically typed silver table, merged from the view by src/run_silver.py
+CREATE TABLE IF NOT EXISTS silver.player_game_logs (
+  season        TEXT NOT NULL,
+  game_id       TEXT NOT NULL,
+  game_date     DATE,
+  player_id     BIGINT NOT NULL,
+  player_name   TEXT,
+  team          TEXT,
+  matchup       TEXT,
+  opponent_team TEXT,
+  minutes       DOUBLE PRECISION,
+  pts           DOUBLE PRECISION,
+  reb           DOUBLE PRECISION,
+  ast           DOUBLE PRECISION,
+  fgm           DOUBLE PRECISION,
+  fga           DOUBLE PRECISION,
+  fg3m          DOUBLE PRECISION,
+  fg3a          DOUBLE PRECISION,
+  ftm           DOUBLE PRECISION,
+  fta           DOUBLE PRECISION,
+  tov           DOUBLE PRECISION,
+  ingested_at   TIMESTAMPTZ,
+  PRIMARY KEY (season, game_id, player_id)
+);
+
+CREATE INDEX IF NOT EXISTS player_game_logs_player_date_idx
+  ON silver.player_game_logs (player_id, game_date);
+
+CREATE INDEX IF NOT EXISTS player_game_logs_season_opponent_idx
+  ON silver.player_game_logs (season, opponent_team);
+
+CREATE INDEX IF NOT EXISTS player_game_logs_ingested_at_idx
+  ON silver.player_game_logs (ingested_at);
+
+CREATE INDEX IF NOT EXISTS player_game_logs_season_team_date_idx
+  ON silver.player_game_logs (season, team, game_date);
@@ -0,0 +1,30 @@
+-- Delta merge of bronze rows ingested in (:low, :high] into silver.player_game_logs
+INSERT INTO silver.player_game_logs (
+  season, game_id, game_date, player_id, player_name, team, matchup, opponent_team,
+  minutes, pts, reb, ast, fgm, fga, fg3m, fg3a, ftm, fta, tov, ingested_at
+)
+SELECT
+  season, game_id, game_date, player_id, player_name, team, matchup, opponent_team,
+  minutes, pts, reb, ast, fgm, fga, fg3m, fg3a, ftm, fta, tov, ingested_at
+FROM silver.player_game_logs_v
+WHERE ingested_at > :low
+  AND ingested_at <= :high
+ON CONFLICT (season, game_id, player_id)
+DO UPDATE SET
+  game_date     = EXCLUDED.game_date,
+  player_name   = EXCLUDED.player_name,
+  team          = EXCLUDED.team,
+  matchup       = EXCLUDED.matchup,
+  opponent_team = EXCLUDED.opponent_team,
+  minutes       = EXCLUDED.minutes,
+  pts           = EXCLUDED.pts,
+  reb           = EXCLUDED.reb,
+  ast           = EXCLUDED.ast,
+  fgm           = EXCLUDED.fgm,
+  fga           = EXCLUDED.fga,
+  fg3m          = EXCLUDED.fg3m,
+  fg3a          = EXCLUDED.fg3a,
+  ftm           = EXCLUDED.ftm,
+  fta           = EXCLUDED.fta,
+  tov           = EXCLUDED.tov,
+  ingested_at   = EXCLUDED.ingested_at;
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+from nba_api.stats.endpoints import leaguegamelog
+
+# ===============================
+# Configuration (env-driven)
+# ===============================
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("NBA_API_CACHE_DIR", str(ROOT / "data" / "cache" / "nba_api")))
+# Set NBA_API_CACHE=0 to always hit the network
+CACHE_ENABLED = os.getenv("NBA_API_CACHE", "1") == "1"
+# Responses for the season in progress are refetched after this many seconds;
+# closed seasons never expire
+CACHE_TTL_SECONDS = int(os.getenv("NBA_API_CACHE_TTL", "3600"))
+# Serve from cache only and fail on a miss (offline runs / local stand-in)
+OFFLINE = os.getenv("NBA_API_OFFLINE", "0") == "1"
+
+
+# Calendar span searched for a season: Sep 1 through Sep 30 of the next year,
+# wide enough for late starts, play-in / playoffs and restarts such as the
+# 2020 bubble. Seasons that ran outside it are listed explicitly.
+SEASON_SPAN_OVERRIDES = {
+    "2019-20": (date(2019, 9, 1), date(2020, 10, 31)),
+}
+
+
+def season_span(season: str) -> tuple:
+    """(first, last) calendar day searched for a season ("2024-25" -> 2024-09-01 .. 2025-09-30)."""
+    if season in SEASON_SPAN_OVERRIDES:
+        return SEASON_SPAN_OVERRIDES[season]
+    start_year = int(season[:4])
+    return date(start_year, 9, 1), date(start_year + 1, 9, 30)
+
+
+def season_end(season: str) -> date:
+    return season_span(season)[1]
+
+
+def season_is_closed(season: str) -> bool:
+    return season_end(season) < date.today()
+
+
+class OfflineCacheMiss(LookupError):
+    """NBA_API_OFFLINE=1 and the response is not cached: retrying cannot help."""
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    payload = json.dumps({"endpoint": endpoint, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.parquet"
+
+
+def is_fresh(path: Path, season: str) -> bool:
+    if not path.exists():
+        return False
+    if season_is_closed(season):
+        return True
+    return time.time() - path.stat().st_mtime < CACHE_TTL_SECONDS
+
+
+def write_cache(path: Path, df: pd.DataFrame):
+    # Write then rename so concurrent readers never see a partial file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def league_game_log(
+    season: str,
+    date_from: str = None,
+    date_to: str = None,
+    season_type: str = "Regular Season",
+    timeout: int = 120,
+    on_miss=None,
+) -> pd.DataFrame:
+    """
+    Player LeagueGameLog result set for a season / date window, served from the
+    on-disk cache when possible. `on_miss` is called right before a network
+    request (e.g. a rate limiter's acquire), so cache hits cost no tokens.
+    """
+    params = {
+        "season": season,
+        "season_type": season_type,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    path = cache_path(cache_key("leaguegamelog.P", params))
+
+    # Offline wins over NBA_API_CACHE=0: an offline run never touches the network
+    if OFFLINE:
+        if path.exists():
+            return pd.read_parquet(path)
+        raise OfflineCacheMiss(f"NBA_API_OFFLINE=1 and no cached response for {params}")
+
+    if CACHE_ENABLED and is_fresh(path, season):
+        return pd.read_parquet(path)
+
+    if on_miss is not None:
+        on_miss()
+
+    resp = leaguegamelog.LeagueGameLog(
+        season=season,
+        season_type_all_star=season_type,
+        player_or_team_abbreviation="P",
+        date_from_nullable=date_from or "",
+        date_to_nullable=date_to or "",
+        timeout=timeout,
+    )
+    df = resp.get_data_frames()[0]
+
+    if CACHE_ENABLED:
+        write_cache(path, df)
+
+    return df
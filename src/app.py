@@ -1,54 +1,55 @@
-import os
 import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine, text
-from dotenv import load_dotenv
+
+from dashboard_data import next_cursor, player_history, query, require_db_url
 
 st.set_page_config(page_title="NBA Warehouse Dashboard", layout="wide")
 
-load_dotenv()
-db_url = os.getenv("DATABASE_URL")
-if not db_url:
-    st.error("DATABASE_URL is not set. Add it to .env locally or Streamlit secrets in deployment.")
+db_url = require_db_url()
+
+st.title("NBA Medallion Warehouse (Bronze → Silver → Gold)")
+
+# Player selector (small dimension table, not a scan of gold.player_features)
+players = query(
+    db_url,
+    "SELECT player_id, player_name, team FROM gold.dim_players ORDER BY player_name, player_id;",
+)
+names = dict(zip(players["player_id"], players["player_name"] + " (" + players["team"].fillna("-") + ")"))
+
+player_id = st.selectbox("Select a player", list(names), format_func=names.get)
+if player_id is None:
+    st.info("No players in gold.dim_players yet. Run the pipeline first.")
     st.stop()
 
-engine = create_engine(db_url)
+# History is paged newest-first; "Load older games" appends the next page
+if st.session_state.get("history_player") != player_id:
+    st.session_state.history_player = player_id
+    st.session_state.history_pages = [player_history(db_url, player_id)]
 
-st.title("NBA Medallion Warehouse (Bronze → Silver → Gold)")
 
-# Player selector
-players = pd.read_sql(
-    text("SELECT DISTINCT player_name FROM gold.player_features ORDER BY player_name;"),
-    engine
-)["player_name"].tolist()
+def load_older_games():
+    pages = st.session_state.history_pages
+    cursor = next_cursor(pages[-1])
+    if cursor is not None:
+        pages.append(player_history(db_url, st.session_state.history_player, before=cursor))
 
-player = st.selectbox("Select a player", players)
 
-df = pd.read_sql(
-    text("""
-        SELECT
-          game_date, team, opponent_team, minutes, pts, reb, ast,
-          pts_last3, reb_last3, ast_last3, min_last3,
-          opp_pts_allowed_rank, opp_reb_allowed_rank, opp_ast_allowed_rank
-        FROM gold.player_features
-        WHERE player_name = :p
-        ORDER BY game_date DESC
-        LIMIT 50;
-    """),
-    engine,
-    params={"p": player}
-)
+pages = st.session_state.history_pages
+df = pd.concat(pages, ignore_index=True)
 
-st.subheader("Recent games (last 50)")
-st.dataframe(df, width="stretch")
+st.subheader(f"Recent games ({len(df)} loaded)")
+st.dataframe(df.drop(columns="game_id"), width="stretch")
+if next_cursor(pages[-1]) is not None:
+    st.button("Load older games", on_click=load_older_games)
 
 st.subheader("Trends")
 df_sorted = df.sort_values("game_date")
 st.line_chart(df_sorted.set_index("game_date")[["pts", "pts_last3", "minutes", "min_last3"]])
 
 st.subheader("Pipeline Run Log (last 20)")
-df_log = pd.read_sql(
-    text("""
+df_log = query(
+    db_url,
+    """
         SELECT
           run_id::text AS run_id,
           layer,
@@ -60,7 +61,6 @@ df_log = pd.read_sql(
         FROM gold.pipeline_run_log
         ORDER BY executed_at DESC
         LIMIT 20
-    """),
-    engine,
+    """,
 )
-st.dataframe(df_log, width="stretch")
\ No newline at end of file
+st.dataframe(df_log, width="stretch")
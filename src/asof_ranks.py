@@ -0,0 +1,145 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from opponent_store import ALLOWED, STATS
+
+RANKS = [f"{col}_RANK" for col in ALLOWED]
+
+
+class SeasonSnapshots:
+    """
+    One season's opponent context after every game date. Row k of each matrix
+    is the state after the first k dates (row 0 = no games yet); columns are
+    teams in sorted order.
+    """
+
+    def __init__(self, dates: np.ndarray, teams: pd.Index, allowed: dict, ranks: dict):
+        self.dates = dates
+        self.teams = teams
+        self.allowed = allowed
+        self.ranks = ranks
+
+    def snapshot_index(self, dates) -> np.ndarray:
+        # Snapshot k covers every date strictly before dates[k]: games played on
+        # the row's own date are not known yet
+        return np.searchsorted(self.dates, np.asarray(dates, dtype="datetime64[ns]"), side="left")
+
+
+class AsOfRanks:
+    """
+    Point-in-time opponent defense: what each team allowed per box-score row
+    (same definition as OpponentDefenseStore) using only games before a given
+    date, and its dense rank among the season's teams as of that date.
+
+    fit() is one pass: per-date totals, a cumulative sum down the dates and a
+    dense rank across ~30 teams per date. lookup() finds each row's snapshot by
+    binary search, so leak-free features for any number of seasons cost
+    O(n log dates) instead of re-ranking per game date.
+    """
+
+    def __init__(self):
+        self.seasons = {}
+
+    def fit(self, df: pd.DataFrame) -> "AsOfRanks":
+        """df needs SEASON, GAME_DATE, OPPONENT_TEAM and the STATS columns."""
+        rows = df[["SEASON", "GAME_DATE", "OPPONENT_TEAM"] + STATS].dropna(subset=["OPPONENT_TEAM", "GAME_DATE"])
+        rows = rows.assign(GAME_DATE=pd.to_datetime(rows["GAME_DATE"]).astype("datetime64[ns]"))
+        daily = rows.groupby(["SEASON", "GAME_DATE", "OPPONENT_TEAM"])[STATS].agg(["sum", "size"])
+
+        self.seasons = {}
+        for season, frame in daily.groupby(level="SEASON"):
+            frame = frame.droplevel("SEASON")
+            dates = frame.index.get_level_values("GAME_DATE").unique().sort_values()
+            teams = frame.index.get_level_values("OPPONENT_TEAM").unique().sort_values()
+
+            def cumulative(col):
+                wide = frame[col].unstack("OPPONENT_TEAM", fill_value=0).reindex(
+                    index=dates, columns=teams, fill_value=0
+                )
+                cum = wide.to_numpy(dtype="float64").cumsum(axis=0)
+                return np.vstack([np.zeros((1, len(teams))), cum])
+
+            n_rows = cumulative((STATS[0], "size"))
+            allowed, ranks = {}, {}
+            with np.errstate(invalid="ignore", divide="ignore"):
+                for stat, col in zip(STATS, ALLOWED):
+                    mean = cumulative((stat, "sum")) / n_rows
+                    mean[n_rows == 0] = np.nan
+                    allowed[col] = mean
+                    ranks[f"{col}_RANK"] = (
+                        pd.DataFrame(mean).rank(axis=1, method="dense", ascending=True).to_numpy()
+                    )
+
+            self.seasons[season] = SeasonSnapshots(dates.to_numpy(), teams, allowed, ranks)
+        return self
+
+    def lookup(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        ALLOWED and RANKS columns for each (SEASON, OPPONENT_TEAM, GAME_DATE) row
+        of df, aligned to df.index. NaN before a team's first game of the season.
+        """
+        out = pd.DataFrame(np.nan, index=df.index, columns=ALLOWED + RANKS)
+        game_dates = pd.to_datetime(df["GAME_DATE"]).astype("datetime64[ns]")
+        positions = np.arange(len(df))
+
+        for season, idx in df.groupby("SEASON", sort=False).indices.items():
+            snapshots = self.seasons.get(season)
+            if snapshots is None:
+                continue
+            k = snapshots.snapshot_index(game_dates.to_numpy()[idx])
+            t = snapshots.teams.get_indexer(df["OPPONENT_TEAM"].to_numpy()[idx])
+            known = t >= 0
+            rows = positions[idx][known]
+            for col in ALLOWED:
+                out.iloc[rows, out.columns.get_loc(col)] = snapshots.allowed[col][k[known], t[known]]
+            for col in RANKS:
+                out.iloc[rows, out.columns.get_loc(col)] = snapshots.ranks[col][k[known], t[known]]
+        return out
+
+    def rank(self, season: str, team: str, date, stat: str = "PTS") -> float:
+        """Dense rank of `team`'s defense on `stat` using games before `date`."""
+        snapshots = self.seasons.get(season)
+        if snapshots is None or team not in snapshots.teams:
+            return np.nan
+        k = snapshots.snapshot_index([pd.Timestamp(date)])[0]
+        return snapshots.ranks[f"OPP_{stat}_ALLOWED_RANK"][k, snapshots.teams.get_loc(team)]
+
+
+def naive_asof(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation: re-rank the season for every game date."""
+    out = []
+    rows = df.assign(GAME_DATE=pd.to_datetime(df["GAME_DATE"]))
+    for (season, day), group in rows.groupby(["SEASON", "GAME_DATE"]):
+        before = rows[(rows["SEASON"] == season) & (rows["GAME_DATE"] < day)]
+        if before.empty:
+            continue
+        allowed = before.groupby("OPPONENT_TEAM")[STATS].agg(lambda s: s.sum() / len(s))
+        allowed.columns = ALLOWED
+        ranks = allowed.rank(method="dense", ascending=True).add_suffix("_RANK")
+        out.append(group[["OPPONENT_TEAM"]].join(pd.concat([allowed, ranks], axis=1), on="OPPONENT_TEAM"))
+    return pd.concat(out).drop(columns="OPPONENT_TEAM").reindex(df.index)
+
+
+if __name__ == "__main__":
+    from features import parse_opponents
+    from synthetic import make_game_logs
+
+    history = make_game_logs(seasons=["2022-23", "2023-24", "2024-25"])
+    history["OPPONENT_TEAM"] = parse_opponents(history["MATCHUP"])
+
+    t0 = time.perf_counter()
+    asof = AsOfRanks().fit(history)
+    fitted = time.perf_counter() - t0
+    looked_up = asof.lookup(history)
+    total = time.perf_counter() - t0
+    print(f"As-of ranks for {len(history)} rows: fit {fitted:.3f}s, fit + lookup {total:.3f}s")
+
+    sample = history[history["SEASON"] == "2024-25"]
+    t0 = time.perf_counter()
+    expected = naive_asof(sample)
+    print(f"Per-date re-ranking for one season: {time.perf_counter() - t0:.3f}s")
+
+    pd.testing.assert_frame_equal(looked_up.loc[sample.index, ALLOWED + RANKS], expected[ALLOWED + RANKS])
+    print("As-of lookup matches per-date re-ranking")
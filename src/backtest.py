@@ -0,0 +1,180 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+from threadpoolctl import threadpool_limits
+
+from feature_store import write_dataset
+from obs import start_run
+from train_model import FEATURE_COLS, MODEL_BACKEND, feature_matrix, load_features, make_estimator
+
+# ===============================
+# Configuration (env-driven)
+# ===============================
+
+# Each fold tests on [D, D + window) and trains on every row whose label
+# (PTS_NEXT_GAME, the player's next game) was played before its cutoff date D
+BACKTEST_WINDOW_DAYS = int(os.getenv("BACKTEST_WINDOW_DAYS", "14"))
+# First cutoff: this many days after the first game
+BACKTEST_MIN_TRAIN_DAYS = int(os.getenv("BACKTEST_MIN_TRAIN_DAYS", "60"))
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+BACKTEST_SCRATCH_DIR = os.getenv("BACKTEST_SCRATCH_DIR") or None
+
+# Label date of a player's last labelled row: its next game is not in the data
+UNKNOWN_LABEL_DATE = np.datetime64("9999-12-31", "D")
+
+# Set in each worker by open_matrix(): the shared feature matrix and label
+# dates, opened read-only
+_matrix = None
+_label_days = None
+
+
+def write_matrix(df: pd.DataFrame, directory: Path) -> Path:
+    """
+    Features plus PTS_NEXT_GAME as the last column, float32, in date order,
+    with each row's LABEL_DATE in label_days.npy beside it.
+    """
+    path = directory / "features.npy"
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(len(df), len(FEATURE_COLS) + 1))
+    matrix[:, :-1] = feature_matrix(df, FEATURE_COLS)
+    matrix[:, -1] = df["PTS_NEXT_GAME"].to_numpy(dtype=np.float32)
+    matrix.flush()
+    del matrix
+    np.save(directory / "label_days.npy", label_days(df))
+    return path
+
+
+def open_matrix(path: str):
+    """Pool initializer: every worker maps the same files, so the OS page cache holds one copy."""
+    global _matrix, _label_days
+    _matrix = np.load(path, mmap_mode="r")
+    _label_days = np.load(Path(path).with_name("label_days.npy"), mmap_mode="r")
+
+
+def label_days(df: pd.DataFrame) -> np.ndarray:
+    """LABEL_DATE as days; an unknown label date (NaT) sorts after every cutoff."""
+    days = df["LABEL_DATE"].to_numpy(dtype="datetime64[D]")
+    # The sentinel is outside the ns range pandas keeps dates in, so it is only applied here
+    return np.where(np.isnat(days), UNKNOWN_LABEL_DATE, days)
+
+
+def make_folds(df: pd.DataFrame) -> list:
+    """
+    Walk-forward folds over rows sorted by date: (cutoff, test_start, test_end)
+    row ranges. A fold trains on the rows before test_start whose label date
+    is before the cutoff.
+    """
+    days = df["GAME_DATE"].to_numpy(dtype="datetime64[D]")
+    labels = label_days(df)
+    first, last = days[0], days[-1]
+    window = np.timedelta64(BACKTEST_WINDOW_DAYS, "D")
+
+    folds = []
+    cutoff = first + np.timedelta64(BACKTEST_MIN_TRAIN_DAYS, "D")
+    while cutoff <= last:
+        test_start = int(np.searchsorted(days, cutoff, side="left"))
+        test_end = int(np.searchsorted(days, cutoff + window, side="left"))
+        if test_end > test_start and np.any(labels[:test_start] < cutoff):
+            folds.append((pd.Timestamp(cutoff), test_start, test_end))
+        cutoff += window
+    return folds
+
+
+def run_fold(fold, backend: str, threads: int, params: dict = None) -> dict:
+    cutoff, test_start, test_end = fold
+    # Only rows whose next game was already played by the cutoff: a label
+    # inside (or after) the test window would leak it into training
+    train = np.flatnonzero(_label_days[:test_start] < np.datetime64(cutoff, "D"))
+    x_train, y_train = _matrix[train, :-1], _matrix[train, -1]
+    # Row ranges of the memmap are views: nothing is copied until the estimator bins them
+    x_test, y_test = _matrix[test_start:test_end, :-1], _matrix[test_start:test_end, -1]
+
+    model = make_estimator(backend, params)
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=threads)
+
+    t0 = time.perf_counter()
+    # Cap OpenMP / BLAS threads so workers x threads does not oversubscribe the cores
+    with threadpool_limits(limits=threads):
+        model.fit(x_train, y_train)
+        y_pred = model.predict(x_test)
+
+    return {
+        "CUTOFF": cutoff,
+        "TRAIN_ROWS": len(train),
+        "TEST_ROWS": test_end - test_start,
+        "MAE": mean_absolute_error(y_test, y_pred),
+        "R2": r2_score(y_test, y_pred) if test_end - test_start > 1 else np.nan,
+        "FIT_SECONDS": time.perf_counter() - t0,
+    }
+
+
+def prepare(df: pd.DataFrame):
+    """Labelled rows in date order, with the date of each row's label game, and their walk-forward folds."""
+    df = df.dropna(subset=["PTS_NEXT_GAME"]).assign(GAME_DATE=lambda d: pd.to_datetime(d["GAME_DATE"]))
+    # engineer_features takes PTS_NEXT_GAME from the player's next row (across seasons)
+    by_player = df.sort_values(["PLAYER_NAME", "GAME_DATE"], kind="stable")
+    # NaT for a player's last labelled row; label_days() maps it to UNKNOWN_LABEL_DATE
+    df["LABEL_DATE"] = by_player.groupby("PLAYER_NAME")["GAME_DATE"].shift(-1)
+    df = df.sort_values("GAME_DATE", kind="stable").reset_index(drop=True)
+    folds = make_folds(df)
+    if not folds:
+        raise ValueError("Not enough history for a single backtest fold")
+    return df, folds
+
+
+def backtest(df: pd.DataFrame, backend: str = MODEL_BACKEND, workers: int = BACKTEST_WORKERS) -> pd.DataFrame:
+    df, folds = prepare(df)
+
+    workers = max(1, min(workers, len(folds)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"Backtesting {backend} on {len(df)} rows: {len(folds)} folds, {workers} workers x {threads} threads")
+
+    scratch = Path(tempfile.mkdtemp(prefix="backtest-", dir=BACKTEST_SCRATCH_DIR))
+    try:
+        path = write_matrix(df, scratch)
+        with ProcessPoolExecutor(max_workers=workers, initializer=open_matrix, initargs=(str(path),)) as pool:
+            results = list(pool.map(run_fold, folds, [backend] * len(folds), [threads] * len(folds)))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    out = pd.DataFrame(results)
+    out.insert(0, "FOLD", range(len(out)))
+    out["CUTOFF"] = out["CUTOFF"].astype("datetime64[ns]")
+    # Season of the test window (folds never mix seasons' test rows in practice:
+    # the off-season is longer than a window)
+    out["SEASON"] = df["SEASON"].to_numpy()[[test_start for _, test_start, _ in folds]]
+    return out
+
+
+def main(df_features: pd.DataFrame = None) -> pd.DataFrame:
+    if df_features is None:
+        print("Loading features from the feature store")
+        df_features = load_features()
+
+    run_id, start = start_run()
+    folds = backtest(df_features)
+    folds.insert(0, "RUN_ID", run_id)
+    folds.insert(1, "BACKEND", MODEL_BACKEND)
+
+    for row in folds.itertuples():
+        print(
+            f"Fold {row.FOLD:>3} {row.CUTOFF:%Y-%m-%d}: train {row.TRAIN_ROWS:>7} test {row.TEST_ROWS:>6} "
+            f"MAE {row.MAE:.3f}  R^2 {row.R2:.3f}  ({row.FIT_SECONDS:.2f}s)"
+        )
+    weighted_mae = np.average(folds["MAE"], weights=folds["TEST_ROWS"])
+    print(f"Backtest {run_id}: MAE {weighted_mae:.3f} (fold std {folds['MAE'].std():.3f}) in {time.time() - start:.1f}s")
+
+    # One dataset per run, so earlier backtests are kept for comparison
+    write_dataset(folds, f"backtest_folds/{run_id}")
+    return folds
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+from ingest_bronze import load_stage_copy, load_stage_to_sql
+from synthetic import make_game_logs
+
+# Rows are generated locally and only the staging table is loaded, but both
+# loaders first run the bronze DDL (ensure_bronze_tables): missing tables are
+# created and an unpartitioned bronze.player_game_logs is migrated, as on a
+# normal ingestion run.
+BENCH_SEASONS = os.getenv("BENCH_SEASONS", "2022-23,2023-24,2024-25").split(",")
+
+
+def timed(label: str, fn, rows: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<8} {rows:>8} rows  {elapsed:8.2f}s  {rows / elapsed:>10,.0f} rows/sec")
+    return elapsed
+
+
+def main():
+    load_dotenv()
+    engine = create_engine(os.environ["DATABASE_URL"])
+
+    df = make_game_logs(seasons=BENCH_SEASONS)
+    rows = len(df)
+    print(f"Benchmarking bronze staging load with {rows} synthetic rows ({len(BENCH_SEASONS)} seasons)")
+
+    t_to_sql = timed("to_sql", lambda: load_stage_to_sql(engine, df), rows)
+    t_copy = timed("copy", lambda: load_stage_copy(engine, [df]), rows)
+
+    print(f"COPY speedup: {t_to_sql / t_copy:.1f}x")
+
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bronze.player_game_logs_stage;"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import time
+from functools import partial
+
+import pandas as pd
+
+from feature_specs import OFFLINE_FEATURES, rolling_features
+from features import engineer_features, fetch_opponent, parse_opponents
+from opponent_store import OpponentDefenseStore
+from synthetic import make_game_logs
+
+BENCH_SEASONS = os.getenv("BENCH_SEASONS", "2020-21,2021-22,2022-23,2023-24,2024-25").split(",")
+
+
+def legacy_opponent_defense(df: pd.DataFrame) -> pd.DataFrame:
+    """Whole-season averages allowed and their ranks, one groupby per season / team."""
+    opponent_defense = (
+        df.groupby(["SEASON", "OPPONENT_TEAM"])
+        .agg(
+            OPP_PTS_ALLOWED=("PTS", "mean"),
+            OPP_REB_ALLOWED=("REB", "mean"),
+            OPP_AST_ALLOWED=("AST", "mean"),
+        )
+        .reset_index()
+    )
+    for stat in ["PTS", "REB", "AST"]:
+        opponent_defense[f"OPP_{stat}_ALLOWED_RANK"] = (
+            opponent_defense.groupby("SEASON")[f"OPP_{stat}_ALLOWED"]
+            .rank(method="dense", ascending=True)
+        )
+    return opponent_defense
+
+
+def legacy_rolling(df: pd.DataFrame) -> pd.DataFrame:
+    """One rolling pass per stat over a frame sorted by player and date."""
+    group = df.groupby("PLAYER_NAME")
+    return pd.DataFrame({
+        f"{stat}_LAST5": group[stat].rolling(5, min_periods=1).mean().reset_index(level=0, drop=True)
+        for stat in ["PTS", "REB", "AST", "MIN"]
+    })
+
+
+def engineer_features_legacy(df: pd.DataFrame) -> pd.DataFrame:
+    """Feature engine before vectorization: per-row apply + one rolling pass per stat."""
+    df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])
+    df["OPPONENT_TEAM"] = df["MATCHUP"].apply(fetch_opponent)
+    df = df.merge(legacy_opponent_defense(df), on=["SEASON", "OPPONENT_TEAM"], how="left")
+
+    df = df.sort_values(["PLAYER_NAME", "GAME_DATE"])
+    group = df.groupby("PLAYER_NAME")
+    rolled = legacy_rolling(df)
+    for col in rolled.columns:
+        df[col] = rolled[col]
+    df["PRA_LAST5"] = df["PTS_LAST5"] + df["REB_LAST5"] + df["AST_LAST5"]
+    df["PTS_NEXT_GAME"] = group["PTS"].shift(-1)
+    return df.dropna(subset=["PTS_NEXT_GAME"])
+
+
+def store_opponent_defense(df: pd.DataFrame) -> pd.DataFrame:
+    """The season-level path engineer_features(as_of=False) takes: a fresh running-totals store."""
+    store = OpponentDefenseStore()
+    store.update(df)
+    return store.allowed()
+
+
+def best_of(fn, *args, runs: int = 3) -> float:
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def bench_stages(df: pd.DataFrame):
+    """
+    Each stage on its own, so the vectorized parsing / rolling are not hidden
+    by the opponent store that now computes season-level ranks.
+    """
+    df = df.assign(GAME_DATE=pd.to_datetime(df["GAME_DATE"]), OPPONENT_TEAM=parse_opponents(df["MATCHUP"]))
+    by_player = df.sort_values(["PLAYER_NAME", "GAME_DATE"])
+    stages = [
+        ("parse", (lambda d: d["MATCHUP"].apply(fetch_opponent)), (lambda d: parse_opponents(d["MATCHUP"])), df),
+        ("rolling", legacy_rolling, (lambda d: rolling_features(d, OFFLINE_FEATURES, by="PLAYER_NAME")), by_player),
+        ("ranks", legacy_opponent_defense, store_opponent_defense, df),
+    ]
+    print(f"{'stage':<10} {'legacy':>9} {'current':>9}")
+    for label, legacy, current, frame in stages:
+        t_legacy, t_current = best_of(legacy, frame), best_of(current, frame)
+        print(f"{label:<10} {t_legacy:8.3f}s {t_current:8.3f}s  ({t_legacy / t_current:.1f}x)")
+
+
+def timed(label: str, fn, df: pd.DataFrame):
+    t0 = time.perf_counter()
+    out = fn(df.copy())
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<10} {elapsed:8.3f}s")
+    return out, elapsed
+
+
+def main():
+    df = make_game_logs(seasons=BENCH_SEASONS)
+    print(f"Benchmarking feature engine on {len(df)} synthetic rows ({len(BENCH_SEASONS)} seasons)")
+
+    legacy, t_legacy = timed("legacy", engineer_features_legacy, df)
+    # The legacy engine used whole-season opponent ranks
+    current, t_current = timed("current", partial(engineer_features, as_of=False), df)
+
+    pd.testing.assert_frame_equal(current, legacy, check_like=True)
+    print(f"Outputs identical, speedup: {t_legacy / t_current:.1f}x")
+
+    bench_stages(df)
+
+
+if __name__ == "__main__":
+    main()
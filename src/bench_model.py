@@ -0,0 +1,70 @@
+import io
+import os
+import time
+
+import joblib
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+from features import engineer_features
+from synthetic import make_game_logs
+from train_model import BACKENDS, FEATURE_COLS, feature_matrix, make_estimator
+
+# Two seasons by default: the fully grown forest is ~1.2 GB there and needs
+# several GB more on five (BENCH_SEASONS=2020-21,...,2024-25 to opt in, or
+# BENCH_BACKENDS=hgb for boosting alone)
+BENCH_SEASONS = os.getenv("BENCH_SEASONS", "2023-24,2024-25").split(",")
+BENCH_BACKENDS = os.getenv("BENCH_BACKENDS", ",".join(BACKENDS)).split(",")
+
+
+def model_size_mb(model) -> float:
+    buf = io.BytesIO()
+    joblib.dump(model, buf)
+    return buf.tell() / 1e6
+
+
+def bench(backend: str, x_train, y_train, x_test, y_test) -> dict:
+    model = make_estimator(backend)
+    t0 = time.perf_counter()
+    model.fit(x_train, y_train)
+    fit = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    y_pred = model.predict(x_test)
+    batch = time.perf_counter() - t0
+
+    # One player's next game, as the dashboard / API would ask for it
+    single = x_test[:1]
+    runs = 50
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        model.predict(single)
+    one_row = (time.perf_counter() - t0) / runs
+
+    return {
+        "fit_s": fit,
+        "predict_batch_s": batch,
+        "predict_row_ms": one_row * 1e3,
+        "size_mb": model_size_mb(model),
+        "mae": mean_absolute_error(y_test, y_pred),
+    }
+
+
+def main():
+    df = engineer_features(make_game_logs(seasons=BENCH_SEASONS))
+    x = feature_matrix(df, FEATURE_COLS)
+    y = df["PTS_NEXT_GAME"].to_numpy(dtype="float32")
+    x_train, x_test, y_train, y_test = train_test_split(x, y, test_size=0.2, shuffle=False)
+    print(f"Benchmarking model backends on {len(x_train)} train / {len(x_test)} test rows ({len(BENCH_SEASONS)} seasons)")
+
+    print(f"{'backend':<8} {'fit':>9} {'predict':>9} {'1 row':>9} {'size':>10} {'MAE':>7}")
+    for backend in BENCH_BACKENDS:
+        r = bench(backend, x_train, y_train, x_test, y_test)
+        print(
+            f"{backend:<8} {r['fit_s']:8.2f}s {r['predict_batch_s']:8.3f}s {r['predict_row_ms']:7.2f}ms "
+            f"{r['size_mb']:8.1f}MB {r['mae']:7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import os
+import re
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+ARCHIVE_SCHEMA = os.getenv("BRONZE_ARCHIVE_SCHEMA", "bronze_archive")
+
+LIST_SQL = """
+    SELECT
+      c.relname AS partition,
+      n.nspname AS schema,
+      pg_get_expr(c.relpartbound, c.oid) AS bound,
+      c.reltuples::bigint AS approx_rows,
+      pg_size_pretty(pg_total_relation_size(c.oid)) AS size,
+      age(c.relfrozenxid) AS xid_age
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE i.inhparent = 'bronze.player_game_logs'::regclass
+    ORDER BY c.relname;
+"""
+
+
+def partition_name(season: str) -> str:
+    """Same naming as bronze.ensure_season_partition ("2024-25" -> player_game_logs_2024_25)."""
+    return "player_game_logs_" + re.sub(r"[^0-9A-Za-z]+", "_", season).lower()
+
+
+def list_partitions(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(LIST_SQL)).mappings().all()
+
+
+def freeze_season(engine, season: str):
+    """
+    VACUUM (FREEZE, ANALYZE) a closed season's partition so it is never
+    rewritten by anti-wraparound vacuums and its statistics are final.
+    """
+    part = partition_name(season)
+    # VACUUM cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f'VACUUM (FREEZE, ANALYZE) bronze."{part}";'))
+    print(f"Froze bronze.{part}")
+
+
+def archive_season(engine, season: str):
+    """
+    Detaches a season's partition and moves it to ARCHIVE_SCHEMA. Its rows leave
+    bronze.player_game_logs (silver/gold keep theirs unless fully refreshed);
+    restore_season() puts it back.
+    """
+    part = partition_name(season)
+    with engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE bronze.player_game_logs DETACH PARTITION bronze."{part}";'))
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{ARCHIVE_SCHEMA}";'))
+        conn.execute(text(f'ALTER TABLE bronze."{part}" SET SCHEMA "{ARCHIVE_SCHEMA}";'))
+    print(f"Archived bronze.{part} to {ARCHIVE_SCHEMA}.{part}")
+
+
+def restore_season(engine, season: str):
+    """Re-attaches an archived season (fails if the season was re-ingested meanwhile)."""
+    part = partition_name(season)
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT to_regclass(:name);"), {"name": f"bronze.{part}"}).scalar():
+            raise RuntimeError(
+                f"bronze.{part} exists again (season re-ingested after archiving); "
+                f"merge or drop it before restoring {ARCHIVE_SCHEMA}.{part}"
+            )
+        conn.execute(text(f'ALTER TABLE "{ARCHIVE_SCHEMA}"."{part}" SET SCHEMA bronze;'))
+        conn.execute(text(
+            f'ALTER TABLE bronze.player_game_logs ATTACH PARTITION bronze."{part}" '
+            f"FOR VALUES IN ('{season}');"
+        ))
+    print(f"Restored {ARCHIVE_SCHEMA}.{part} to bronze.player_game_logs")
+
+
+def main(argv=None):
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Manage season partitions of bronze.player_game_logs")
+    parser.add_argument("action", choices=["list", "freeze", "archive", "restore"])
+    parser.add_argument("seasons", nargs="*", help='Seasons such as "2022-23"')
+    args = parser.parse_args(argv)
+
+    if args.action != "list" and not args.seasons:
+        parser.error(f"{args.action} needs at least one season")
+    for season in args.seasons:
+        if not re.fullmatch(r"\d{4}-\d{2}", season):
+            parser.error(f"Not a season: {season!r}")
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+
+    if args.action == "list":
+        for row in list_partitions(engine):
+            print(
+                f"{row['schema']}.{row['partition']:<28} {row['bound']:<24} "
+                f"~{row['approx_rows']} rows  {row['size']:>8}  xid age {row['xid_age']}"
+            )
+        return
+
+    action = {"freeze": freeze_season, "archive": archive_season, "restore": restore_season}[args.action]
+    for season in args.seasons:
+        action(engine, season)
+
+
+if __name__ == "__main__":
+    main()
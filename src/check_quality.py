@@ -1,47 +1,196 @@
 import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
+from obs import start_run
+from profiling import run_profiles, sample_percent, tablesample
+from watermarks import ensure_watermarks, get_watermark, set_watermark
+
+# "incremental" (default): only rows written since the last passing run of each
+# table are checked. "full": every row. "profile": exact checks incrementally,
+# the other row predicates over a TABLESAMPLE of each table (bounded runtime),
+# then sampled statistical profiles (profiling.py).
+QUALITY_MODE = os.getenv("QUALITY_MODE", "incremental")
+QUALITY_WORKERS = int(os.getenv("QUALITY_WORKERS", "4"))
+# Profile mode: fail the run on distribution shifts instead of only warning
+PROFILE_FAIL_ON_SHIFT = os.getenv("PROFILE_FAIL_ON_SHIFT", "0") == "1"
+
+# Each check counts the rows of `table` matching `violation` and passes when
+# there are none. violation=None instead requires the table to have rows.
+# exact=True checks (keys, has-rows) see every row in profile mode too.
+Check = namedtuple("Check", ["name", "table", "violation", "exact"], defaults=(False,))
+
+# Tables checked, with the column that moves whenever a row is (re)written;
+# incremental runs scan only rows past the last passing value
+TABLES = {
+    "bronze.player_game_logs": '"INGESTED_AT"',
+    "silver.player_game_logs": "ingested_at",
+    "gold.player_features": "refreshed_at",
+    "gold.dim_players": "refreshed_at",
+    "gold.opponent_season_totals": "refreshed_at",
+}
+
 CHECKS = [
-    # Gold view should exist + have rows
-    ("gold.player_features Has Rows",
-     "SELECT COUNT(*) FROM gold.player_features;",
-     lambda x: x is not None and x > 0),
-
-    # No null keys in silver
-    ("Silver Keys Not Null",
-     """
-     SELECT COUNT(*) FROM silver.player_game_logs
-     WHERE season IS NULL OR game_id IS NULL OR player_id IS NULL;
-     """,
-     lambda x: x == 0),
-
-    # Opponent ranks should be within a sane range
-    ("Opponent Ranks Not Within Range",
-     """ 
-    SELECT COUNT(*) FROM gold.player_features
-    WHERE opp_pts_allowed_rank IS NOT NULL
-        AND (opp_pts_allowed_rank < 1 OR opp_pts_allowed_rank > 30);
-     """,
-     lambda x: x == 0),
+    # Bronze
+    Check("Bronze Keys Not Null", "bronze.player_game_logs",
+          '"SEASON" IS NULL OR "GAME_ID" IS NULL OR "PLAYER_ID" IS NULL', exact=True),
+    Check("Bronze Game Date Parses", "bronze.player_game_logs",
+          '"GAME_DATE" IS NULL OR "GAME_DATE" !~ \'^\\d{4}-\\d{2}-\\d{2}\''),
+    Check("Bronze Stats Not Negative", "bronze.player_game_logs", '"PTS" < 0 OR "REB" < 0 OR "AST" < 0'),
+
+    # Silver
+    Check("Silver Keys Not Null", "silver.player_game_logs",
+          "season IS NULL OR game_id IS NULL OR player_id IS NULL", exact=True),
+    Check("Silver Game Date Not Null", "silver.player_game_logs", "game_date IS NULL"),
+    Check("Silver Opponent Parsed", "silver.player_game_logs",
+          "opponent_team IS NULL OR opponent_team = ''"),
+    Check("Silver Opponent Differs From Team", "silver.player_game_logs", "opponent_team = team"),
+    Check("Silver Stats Not Negative", "silver.player_game_logs",
+          "minutes < 0 OR pts < 0 OR reb < 0 OR ast < 0 OR tov < 0"),
+    Check("Silver Minutes Plausible", "silver.player_game_logs", "minutes > 70"),
+    Check("Silver Points Plausible", "silver.player_game_logs", "pts > 100"),
+    Check("Silver FGM <= FGA", "silver.player_game_logs", "fgm > fga"),
+    Check("Silver FG3M <= FG3A", "silver.player_game_logs", "fg3m > fg3a"),
+    Check("Silver FTM <= FTA", "silver.player_game_logs", "ftm > fta"),
+    Check("Silver FG3M <= FGM", "silver.player_game_logs", "fg3m > fgm"),
+
+    # Gold
+    Check("gold.player_features Has Rows", "gold.player_features", None, exact=True),
+    Check("Opponent Ranks Not Within Range", "gold.player_features",
+          "opp_pts_allowed_rank IS NOT NULL AND (opp_pts_allowed_rank < 1 OR opp_pts_allowed_rank > 30)"),
+    Check("Opponent Reb Ranks Not Within Range", "gold.player_features",
+          "opp_reb_allowed_rank IS NOT NULL AND (opp_reb_allowed_rank < 1 OR opp_reb_allowed_rank > 30)"),
+    Check("Opponent Ast Ranks Not Within Range", "gold.player_features",
+          "opp_ast_allowed_rank IS NOT NULL AND (opp_ast_allowed_rank < 1 OR opp_ast_allowed_rank > 30)"),
+    Check("Rolling Features Not Negative", "gold.player_features",
+          "pts_last3 < 0 OR reb_last3 < 0 OR ast_last3 < 0 OR min_last3 < 0"),
+    Check("Rolling Points Within Game Range", "gold.player_features", "pts_last3 > 100"),
+    Check("Next Game Points Not Negative", "gold.player_features", "pts_next_game < 0"),
+    Check("Features Opponent Not Null", "gold.player_features", "opponent_team IS NULL"),
+    Check("gold.dim_players Has Rows", "gold.dim_players", None, exact=True),
+    Check("Dim Players Game Counts Positive", "gold.dim_players", "games IS NULL OR games <= 0"),
+    Check("Dim Players Date Range Ordered", "gold.dim_players", "first_game_date > last_game_date"),
+    Check("Opponent Totals Row Counts Positive", "gold.opponent_season_totals",
+          "player_rows IS NULL OR player_rows <= 0"),
+    Check("Opponent Totals Not Negative", "gold.opponent_season_totals", "pts < 0 OR reb < 0 OR ast < 0"),
 ]
 
+
+def quality_watermark(table: str) -> str:
+    return f"quality.{table}"
+
+
+def compile_scan(table: str, checks, incremental: bool, sample: str = "") -> str:
+    """One aggregate over `table` (or a TABLESAMPLE of it) with a count(*) FILTER per check."""
+    column = TABLES[table]
+    select = ["count(*) AS scanned", f"max({column}) AS high"]
+    select += [f"count(*) FILTER (WHERE {c.violation}) AS c{i}" for i, c in enumerate(checks)]
+    where = f"WHERE {column} > :since" if incremental else ""
+    return f"SELECT {', '.join(select)} FROM {table} {sample} {where};"
+
+
+def run_table(engine, table: str, checks, since=None, sampled=()) -> dict:
+    """
+    Runs every check for one table: one scan for the row predicates plus an
+    EXISTS probe per has-rows check. `sampled` row checks are counted in a
+    second scan over a TABLESAMPLE of the whole table (profile mode). Returns
+    values by check name, the rows scanned and the new high-water mark of the
+    table's TABLES column.
+    """
+    row_checks = [c for c in checks if c.violation is not None]
+    t0 = time.time()
+    with engine.connect() as conn:
+        values = {
+            c.name: int(conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table});")).scalar())
+            for c in checks if c.violation is None
+        }
+        scan = conn.execute(
+            text(compile_scan(table, row_checks, since is not None)),
+            {"since": since} if since is not None else {},
+        ).mappings().one()
+
+        sample_scanned = 0
+        if sampled:
+            sample = tablesample(sample_percent(conn, table))
+            sample_scan = conn.execute(text(compile_scan(table, sampled, False, sample))).mappings().one()
+            values.update({c.name: sample_scan[f"c{i}"] for i, c in enumerate(sampled)})
+            sample_scanned = sample_scan["scanned"]
+
+    values.update({c.name: scan[f"c{i}"] for i, c in enumerate(row_checks)})
+    return {
+        "values": values,
+        "scanned": scan["scanned"],
+        "sample_scanned": sample_scanned,
+        "high": scan["high"] if scan["high"] is not None else since,
+        "runtime": time.time() - t0,
+    }
+
+
+def passed(check: Check, value) -> bool:
+    return value > 0 if check.violation is None else value == 0
+
+
 def main():
     load_dotenv()
     engine = create_engine(os.environ["DATABASE_URL"])
+    incremental = QUALITY_MODE in ("incremental", "profile")
+    profile = QUALITY_MODE == "profile"
 
-    failures = []
+    # Checks scanned in full (or since the watermark) / over a sample, per table
+    by_table, sampled = {}, {}
+    for check in CHECKS:
+        by_table.setdefault(check.table, [])
+        sampled.setdefault(check.table, [])
+        (sampled if profile and not check.exact else by_table)[check.table].append(check)
+
+    since = {}
     with engine.begin() as conn:
-        for name, sql, predicate in CHECKS:
-            val = conn.execute(text(sql)).scalar()
-            ok = predicate(val)
-            print(f"{'Successful' if ok else 'Error'} {name}: {val}")
-            if not ok:
-                failures.append((name, val))
+        ensure_watermarks(conn)
+        if incremental:
+            since = {table: get_watermark(conn, quality_watermark(table)) for table in by_table}
+
+    # Tables are scanned concurrently, each on its own pooled connection
+    with ThreadPoolExecutor(max_workers=QUALITY_WORKERS) as pool:
+        futures = {
+            table: pool.submit(run_table, engine, table, checks, since.get(table), sampled[table])
+            for table, checks in by_table.items()
+        }
+        results = {table: f.result() for table, f in futures.items()}
+
+    for table, result in results.items():
+        scope = f"since {since[table]}" if since.get(table) is not None else "all rows"
+        sample = f", {result['sample_scanned']} sampled" if sampled[table] else ""
+        print(f"{table}: {result['scanned']} rows scanned ({scope}){sample} in {result['runtime']:.2f}s")
+
+    failures = []
+    for check in CHECKS:
+        val = results[check.table]["values"][check.name]
+        ok = passed(check, val)
+        print(f"{'Successful' if ok else 'Error'} {check.name}: {val}")
+        if not ok:
+            failures.append((check.name, val))
+
+    if profile:
+        run_id, _ = start_run()
+        for table, columns in run_profiles(engine, run_id).items():
+            for column, flags in columns.items():
+                print(f"Warning {table}.{column} shifted since last profile: {'; '.join(flags)}")
+                if PROFILE_FAIL_ON_SHIFT:
+                    failures.append((f"{table}.{column} shift", flags))
 
     if failures:
         raise SystemExit(f"Quality checks failed: {failures}")
 
+    # Only a passing run moves the watermarks, so failed rows are re-checked
+    with engine.begin() as conn:
+        for table, result in results.items():
+            if result["high"] is not None:
+                set_watermark(conn, quality_watermark(table), result["high"])
+
     print("All quality checks passed.")
 
 if __name__ == "__main__":
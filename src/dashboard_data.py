@@ -0,0 +1,205 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
+
+# ===============================
+# Configuration (env-driven)
+# ===============================
+
+# How long a query result is reused, at most
+DATA_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "600"))
+# How often the dashboard checks gold.pipeline_run_log for a newer successful run
+VERSION_TTL = int(os.getenv("DASHBOARD_VERSION_TTL", "60"))
+# Player history is loaded this many games at a time
+PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+# Upper bound on history pages held in memory (shared by all sessions)
+HISTORY_CACHE_PAGES = int(os.getenv("DASHBOARD_HISTORY_CACHE_PAGES", "500"))
+# First pages of the N most-viewed players are kept warm
+PREFETCH_PLAYERS = int(os.getenv("DASHBOARD_PREFETCH_PLAYERS", "10"))
+PREFETCH_WORKERS = int(os.getenv("DASHBOARD_PREFETCH_WORKERS", "2"))
+
+VERSION_SQL = """
+    SELECT max(executed_at)
+    FROM gold.pipeline_run_log
+    WHERE status = 'success';
+"""
+
+# Keyset pagination on (game_date, game_id) within a player, served by
+# player_features_player_id_date_game_idx (a date alone is not unique: a page
+# boundary inside one date would skip or repeat rows)
+HISTORY_SQL = """
+    SELECT
+      game_id, game_date, team, opponent_team, minutes, pts, reb, ast,
+      pts_last3, reb_last3, ast_last3, min_last3,
+      opp_pts_allowed_rank, opp_reb_allowed_rank, opp_ast_allowed_rank
+    FROM gold.player_features
+    WHERE player_id = :p {cursor}
+    ORDER BY game_date DESC, game_id DESC
+    LIMIT :limit;
+"""
+
+
+def require_db_url() -> str:
+    """DATABASE_URL for dashboard pages; stops the page with an error if unset."""
+    load_dotenv()
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        st.error("DATABASE_URL is not set. Add it to .env locally or Streamlit secrets in deployment.")
+        st.stop()
+    return db_url
+
+
+@st.cache_resource
+def get_engine(db_url: str):
+    # One pooled engine per process, shared by every session and rerun
+    return create_engine(
+        db_url,
+        pool_size=5,
+        max_overflow=5,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+    )
+
+
+@st.cache_data(ttl=VERSION_TTL, show_spinner=False)
+def data_version(db_url: str):
+    """Timestamp of the latest successful pipeline run; a new one invalidates query results."""
+    with get_engine(db_url).connect() as conn:
+        version = conn.execute(text(VERSION_SQL)).scalar()
+    return version.isoformat() if version is not None else None
+
+
+@st.cache_data(ttl=DATA_TTL, max_entries=256, show_spinner=False)
+def _query(db_url: str, sql: str, params: tuple, version) -> pd.DataFrame:
+    # `version` is only part of the cache key
+    with get_engine(db_url).connect() as conn:
+        return pd.read_sql(text(sql), conn, params=dict(params))
+
+
+def query(db_url: str, sql: str, params: dict = None) -> pd.DataFrame:
+    """
+    Runs sql with params, cached by (sql, params) until DATA_TTL expires or a
+    new successful pipeline run is logged. Callers must not mutate the result.
+    """
+    return _query(db_url, sql, tuple(sorted((params or {}).items())), data_version(db_url))
+
+
+def seasons(db_url: str) -> list:
+    """Seasons present in the rollups, newest first."""
+    df = query(db_url, "SELECT DISTINCT season FROM gold.opponent_season_totals ORDER BY season DESC;")
+    return df["season"].tolist()
+
+
+class HistoryCache:
+    """
+    Bounded LRU of player history pages, keyed by (data version, player_id,
+    cursor), with per-player view counts and a small pool for prefetching.
+    """
+
+    def __init__(self, max_pages: int = HISTORY_CACHE_PAGES, workers: int = PREFETCH_WORKERS):
+        self.max_pages = max_pages
+        self.views = Counter()
+        self._pages = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="history-prefetch")
+
+    def get(self, key):
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self._pages.move_to_end(key)
+            return page
+
+    def put(self, key, page: pd.DataFrame):
+        with self._lock:
+            self._pages[key] = page
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+    def record_view(self, player_id):
+        with self._lock:
+            self.views[player_id] += 1
+
+    def most_viewed(self, n: int):
+        with self._lock:
+            return [player_id for player_id, _ in self.views.most_common(n)]
+
+    def prefetch(self, key, load):
+        """Loads key in the background unless it is cached or already loading."""
+        with self._lock:
+            if key in self._pages or key in self._pending:
+                return
+            self._pending.add(key)
+        self._pool.submit(self._load, key, load)
+
+    def _load(self, key, load):
+        try:
+            self.put(key, load())
+        except Exception as e:
+            print(f"History prefetch failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+@st.cache_resource
+def history_cache() -> HistoryCache:
+    return HistoryCache()
+
+
+def fetch_history_page(engine, player_id: int, before=None, limit: int = PAGE_SIZE) -> pd.DataFrame:
+    """One page of a player's games, newest first, strictly before the (game_date, game_id) cursor `before`."""
+    params = {"p": player_id, "limit": limit}
+    cursor = ""
+    if before is not None:
+        cursor = "AND (game_date, game_id) < (:before_date, :before_game)"
+        params["before_date"], params["before_game"] = before
+    with engine.connect() as conn:
+        return pd.read_sql(text(HISTORY_SQL.format(cursor=cursor)), conn, params=params)
+
+
+def next_cursor(page: pd.DataFrame):
+    """(game_date, game_id) cursor for the page after `page`, or None if it was the last one."""
+    if len(page) < PAGE_SIZE:
+        return None
+    last = page.iloc[-1]
+    return last["game_date"], last["game_id"]
+
+
+def player_history(db_url: str, player_id: int, before=None) -> pd.DataFrame:
+    """
+    A page of player_id's history (see fetch_history_page), served from the
+    shared HistoryCache. Also prefetches the following page and the first page
+    of the most-viewed players, so paging and switching players rarely wait on
+    the warehouse. Callers must not mutate the result.
+    """
+    version = data_version(db_url)
+    engine = get_engine(db_url)
+    cache = history_cache()
+    player_id = int(player_id)
+
+    key = (version, player_id, before)
+    page = cache.get(key)
+    if page is None:
+        page = fetch_history_page(engine, player_id, before)
+        cache.put(key, page)
+
+    if before is None:
+        cache.record_view(player_id)
+
+    cursor = next_cursor(page)
+    if cursor is not None:
+        cache.prefetch((version, player_id, cursor), partial(fetch_history_page, engine, player_id, cursor))
+    for popular in cache.most_viewed(PREFETCH_PLAYERS):
+        cache.prefetch((version, popular, None), partial(fetch_history_page, engine, popular))
+
+    return page
@@ -1,10 +1,11 @@
-from pathlib import Path
 import pandas as pd
 import numpy as np
 
-def load_predictions(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    print(f"Loaded {len(df)} rows from {path}")
+from feature_store import read_dataset, write_dataset
+
+def load_predictions(name: str = "test_with_preds") -> pd.DataFrame:
+    df = read_dataset(name)
+    print(f"Loaded {len(df)} rows from feature store dataset {name}")
     return df
 
 def compute_anomalies(df: pd.DataFrame) -> pd.DataFrame:
@@ -28,17 +29,19 @@ def compute_anomalies(df: pd.DataFrame) -> pd.DataFrame:
 
     return df_sorted
 
-def save_anomalies(df: pd.DataFrame, out_path: str):
-    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, index=False)
-    print(f"Saved anomalies to {out_path}")
+def save_anomalies(df: pd.DataFrame, name: str = "anomalies"):
+    write_dataset(df, name)
 
-if __name__ == "__main__":
-    root = Path(__file__).resolve().parents[1]
-    preds_path = root / "data" / "processed" / "test_with_preds.csv"
+def load_cached(name: str = "anomalies") -> pd.DataFrame:
+    return read_dataset(name)
 
-    df = load_predictions(str(preds_path))
-    df_anom = compute_anomalies(df)
+def main(df: pd.DataFrame = None) -> pd.DataFrame:
+    if df is None:
+        df = load_predictions()
+    df_anom = compute_anomalies(df.copy())
 
-    out_path = root / "data" / "processed" / "anomalies.csv"
-    save_anomalies(df_anom, str(out_path))
\ No newline at end of file
+    save_anomalies(df_anom)
+    return df_anom
+
+if __name__ == "__main__":
+    main()
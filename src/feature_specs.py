@@ -0,0 +1,153 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# One rolling feature: box-score stat (bronze column name) x window (games) x aggregate
+FeatureSpec = namedtuple("FeatureSpec", ["stat", "window", "agg"])
+
+AGG_SUFFIX = {
+    "mean": "LAST",
+    "std": "STD",
+    "sum": "SUM",
+    "ewm": "EWM",
+}
+
+SQL_AGG = {
+    "mean": "avg",
+    "std": "stddev_samp",
+    "sum": "sum",
+}
+
+# Bronze stat -> silver/gold column where the names differ
+SQL_COLUMNS = {
+    "MIN": "minutes",
+}
+
+
+def feature_specs(stats, windows, aggs=("mean",)):
+    return [FeatureSpec(stat, window, agg) for agg in aggs for window in windows for stat in stats]
+
+
+# ===============================
+# Registries
+# ===============================
+
+# Columns of gold.player_features (pts_last3, ...). After changing this list run
+# src/run_gold.py once with GOLD_FULL_REFRESH=1 to backfill the new columns.
+GOLD_FEATURES = feature_specs(["PTS", "REB", "AST", "MIN"], windows=[3])
+
+# Offline training features built by src/features.py (PTS_LAST5, ...)
+OFFLINE_FEATURES = feature_specs(["PTS", "REB", "AST", "MIN"], windows=[5])
+
+
+def feature_name(spec: FeatureSpec) -> str:
+    if spec.agg not in AGG_SUFFIX:
+        raise ValueError(f"Unknown aggregate {spec.agg!r}, expected one of {sorted(AGG_SUFFIX)}")
+    return f"{spec.stat}_{AGG_SUFFIX[spec.agg]}{spec.window}"
+
+
+# ===============================
+# SQL (gold layer)
+# ===============================
+
+def sql_feature_name(spec: FeatureSpec) -> str:
+    return feature_name(spec).lower()
+
+
+def sql_window_expression(spec: FeatureSpec, alias: str = "p") -> str:
+    if spec.agg not in SQL_AGG:
+        raise ValueError(f"{spec.agg!r} features have no SQL window equivalent; use them offline only")
+    column = SQL_COLUMNS.get(spec.stat, spec.stat.lower())
+    return (
+        f"{SQL_AGG[spec.agg]}({alias}.{column}) OVER ("
+        f"PARTITION BY {alias}.player_id ORDER BY {alias}.game_date "
+        f"ROWS BETWEEN {spec.window - 1} PRECEDING AND CURRENT ROW"
+        f") AS {sql_feature_name(spec)}"
+    )
+
+
+def render_gold_sql(specs=GOLD_FEATURES) -> dict:
+    """
+    Fragments substituted into sql/gold_player_features_merge.sql and the
+    ALTER TABLE statements that add any registry column gold is missing.
+    """
+    names = [sql_feature_name(s) for s in specs]
+    return {
+        "rolling_expressions": ",\n    ".join(sql_window_expression(s) for s in specs),
+        "rolling_columns": ", ".join(names),
+        "rolling_updates": ",\n  ".join(f"{n} = EXCLUDED.{n}" for n in names),
+        "add_columns": [
+            f"ALTER TABLE gold.player_features ADD COLUMN IF NOT EXISTS {n} DOUBLE PRECISION;"
+            for n in names
+        ],
+    }
+
+
+# ===============================
+# pandas / NumPy (offline path)
+# ===============================
+
+def rolling_features(df: pd.DataFrame, specs, by: str) -> pd.DataFrame:
+    """
+    Computes every spec for a frame already sorted by [by, date] and returns
+    them as new columns aligned to df.index. Windows behave like
+    rolling(window, min_periods=1): NaNs are skipped, std needs two values.
+
+    Means, sums and stds come from one grouped cumulative sum over all stats,
+    so each extra window is a couple of vector subtractions, not a new pass.
+    """
+    codes = pd.factorize(df[by])[0]
+    n = len(df)
+    pos = np.arange(n)
+    new_group = np.r_[True, codes[1:] != codes[:-1]] if n else np.zeros(0, dtype=bool)
+    group_start = np.maximum.accumulate(np.where(new_group, pos, 0)) if n else pos
+
+    out = {}
+
+    window_specs = [s for s in specs if s.agg != "ewm"]
+    stats = list(dict.fromkeys(s.stat for s in window_specs))
+    if stats:
+        x = df[stats].to_numpy(dtype=float)
+        valid = ~np.isnan(x)
+        # Squares are accumulated around the (rounded) column mean to keep std
+        # precise; rounding keeps integer box scores exact
+        center = np.round(np.nan_to_num(np.nanmean(x, axis=0))) if n else np.zeros(len(stats))
+        x0 = np.where(valid, x, 0.0)
+        dev = np.where(valid, x - center, 0.0)
+
+        blocks = np.hstack([valid.astype(float), x0, dev * dev])
+        cs = pd.DataFrame(blocks).groupby(codes, sort=False).cumsum().to_numpy()
+        k = len(stats)
+
+        for window in sorted({s.window for s in window_specs}):
+            prev = pos - window
+            has_prev = (prev >= group_start)[:, None]
+            sums = cs - np.where(has_prev, cs[np.maximum(prev, 0)], 0.0)
+            count, total, sq = sums[:, :k], sums[:, k:2 * k], sums[:, 2 * k:]
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.where(count > 0, total / count, np.nan)
+                dev_sum = total - count * center
+                var = (sq - dev_sum * dev_sum / count) / (count - 1)
+                std = np.where(count > 1, np.sqrt(np.clip(var, 0.0, None)), np.nan)
+            total = np.where(count > 0, total, np.nan)
+
+            by_agg = {"mean": mean, "sum": total, "std": std}
+            for spec in window_specs:
+                if spec.window == window:
+                    out[feature_name(spec)] = by_agg[spec.agg][:, stats.index(spec.stat)]
+
+    # Exponentially weighted means (span = window) need their own recursion
+    ewm_specs = [s for s in specs if s.agg == "ewm"]
+    for window in sorted({s.window for s in ewm_specs}):
+        ewm_stats = list(dict.fromkeys(s.stat for s in ewm_specs if s.window == window))
+        smoothed = (
+            df[ewm_stats].groupby(codes, sort=False).ewm(span=window).mean()
+            .reset_index(level=0, drop=True)
+            .reindex(df.index)
+        )
+        for stat in ewm_stats:
+            out[feature_name(FeatureSpec(stat, window, "ewm"))] = smoothed[stat].to_numpy()
+
+    return pd.DataFrame(out, index=df.index)
@@ -0,0 +1,211 @@
+import math
+import pickle
+import time
+from collections import deque
+from pathlib import Path
+
+import pandas as pd
+
+from feature_specs import OFFLINE_FEATURES, FeatureSpec, feature_name
+
+
+class RollingWindow:
+    """Last `window` values of one stat with running sum / sum of squares / count."""
+
+    def __init__(self, window: int):
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.sq = 0.0
+        self.count = 0
+
+    def _add(self, x):
+        if not math.isnan(x):
+            self.total += x
+            self.sq += x * x
+            self.count += 1
+
+    def _remove(self, x):
+        if not math.isnan(x):
+            self.total -= x
+            self.sq -= x * x
+            self.count -= 1
+
+    def push(self, x: float):
+        if len(self.values) == self.values.maxlen:
+            self._remove(self.values[0])
+        self.values.append(x)
+        self._add(x)
+
+    def replace_last(self, x: float):
+        self._remove(self.values[-1])
+        self.values[-1] = x
+        self._add(x)
+
+    def value(self, agg: str) -> float:
+        if self.count == 0:
+            return math.nan
+        if agg == "mean":
+            return self.total / self.count
+        if agg == "sum":
+            return self.total
+        if agg == "std":
+            if self.count < 2:
+                return math.nan
+            var = (self.sq - self.total * self.total / self.count) / (self.count - 1)
+            return math.sqrt(max(var, 0.0))
+        raise ValueError(f"Unknown aggregate {agg!r}")
+
+
+class EwmState:
+    """Adjusted exponentially weighted mean (span = window), same as pandas ewm(span).mean()."""
+
+    def __init__(self, window: int):
+        self.beta = 1 - 2 / (window + 1)
+        self.num = 0.0
+        self.den = 0.0
+        self._prev = (0.0, 0.0)
+
+    def push(self, x: float):
+        self._prev = (self.num, self.den)
+        self.num *= self.beta
+        self.den *= self.beta
+        if not math.isnan(x):
+            self.num += x
+            self.den += 1.0
+
+    def replace_last(self, x: float):
+        self.num, self.den = self._prev
+        self.push(x)
+
+    def value(self, agg: str = "ewm") -> float:
+        return self.num / self.den if self.den > 0 else math.nan
+
+
+class PlayerFeatureState:
+    """
+    Rolling state for one player. Each new game is O(1) per spec: the oldest
+    value leaves the ring buffer and the running sums are adjusted.
+    """
+
+    def __init__(self, specs):
+        self.specs = list(specs)
+        self.windows = {}
+        for spec in self.specs:
+            key = (spec.stat, spec.window, spec.agg == "ewm")
+            if key not in self.windows:
+                self.windows[key] = EwmState(spec.window) if spec.agg == "ewm" else RollingWindow(spec.window)
+        self.last_game_id = None
+        self.last_game_date = None
+
+    def push(self, game: dict, replace: bool = False):
+        for (stat, _, _), state in self.windows.items():
+            x = game.get(stat)
+            x = math.nan if x is None else float(x)
+            if replace:
+                state.replace_last(x)
+            else:
+                state.push(x)
+
+    def features(self) -> dict:
+        out = {
+            feature_name(spec): self.windows[(spec.stat, spec.window, spec.agg == "ewm")].value(spec.agg)
+            for spec in self.specs
+        }
+        # Same derived column as features.engineer_features
+        for spec in self.specs:
+            if spec.agg == "mean" and spec.stat == "PTS":
+                parts = [feature_name(FeatureSpec(s, spec.window, "mean")) for s in ("PTS", "REB", "AST")]
+                if all(p in out for p in parts):
+                    out[f"PRA_LAST{spec.window}"] = sum(out[p] for p in parts)
+        return out
+
+
+class FeatureStateStore:
+    """
+    Incremental feature state for every player, keyed like engineer_features
+    (PLAYER_NAME by default). update() takes one box score and returns the
+    features for that game plus the PTS_NEXT_GAME target now known for the
+    player's previous game.
+    """
+
+    def __init__(self, specs=OFFLINE_FEATURES, key: str = "PLAYER_NAME"):
+        self.specs = list(specs)
+        self.key = key
+        self.players = {}
+
+    def update(self, game: dict) -> dict:
+        player = game[self.key]
+        game_date = pd.Timestamp(game["GAME_DATE"])
+        state = self.players.get(player)
+        if state is None:
+            state = self.players[player] = PlayerFeatureState(self.specs)
+
+        previous = None
+        if state.last_game_id is not None and game.get("GAME_ID") == state.last_game_id:
+            # Stat correction for the latest game: swap its values in place
+            state.push(game, replace=True)
+        else:
+            if state.last_game_date is not None and game_date < state.last_game_date:
+                raise ValueError(
+                    f"{player}: game on {game_date.date()} is older than the last "
+                    f"processed game ({state.last_game_date.date()}); rebuild with warm_start()"
+                )
+            if state.last_game_id is not None:
+                previous = {"GAME_ID": state.last_game_id, "PTS_NEXT_GAME": game.get("PTS")}
+            state.push(game)
+            state.last_game_id = game.get("GAME_ID")
+            state.last_game_date = game_date
+
+        return {
+            self.key: player,
+            "GAME_ID": state.last_game_id,
+            "features": state.features(),
+            "previous": previous,
+        }
+
+    def warm_start(self, df: pd.DataFrame) -> "FeatureStateStore":
+        """Replays a history frame (any order) through update()."""
+        ordered = df.assign(GAME_DATE=pd.to_datetime(df["GAME_DATE"])).sort_values([self.key, "GAME_DATE"])
+        for game in ordered.to_dict("records"):
+            self.update(game)
+        return self
+
+    def features_for(self, player) -> dict:
+        state = self.players.get(player)
+        return state.features() if state is not None else None
+
+    def checkpoint(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @staticmethod
+    def restore(path) -> "FeatureStateStore":
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+if __name__ == "__main__":
+    from synthetic import make_game_logs
+
+    history = make_game_logs(seasons=["2024-25"])
+    t0 = time.perf_counter()
+    store = FeatureStateStore().warm_start(history)
+    print(f"Warm start: {len(history)} games for {len(store.players)} players in {time.perf_counter() - t0:.2f}s")
+
+    last = history.iloc[-1].to_dict()
+    n = 10_000
+    games = [
+        {**last, "GAME_ID": f"live-{i}", "GAME_DATE": pd.Timestamp(last["GAME_DATE"]) + pd.Timedelta(days=i + 1)}
+        for i in range(n)
+    ]
+
+    t0 = time.perf_counter()
+    for game in games:
+        result = store.update(game)
+    per_update = (time.perf_counter() - t0) / n
+    print(f"Single box-score update: {per_update * 1e6:.1f} µs")
+    print(result)
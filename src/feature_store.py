@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ===============================
+# Configuration (env-driven)
+# ===============================
+
+ROOT = Path(__file__).resolve().parents[1]
+STORE_DIR = Path(os.getenv("FEATURE_STORE_DIR", str(ROOT / "data" / "store")))
+# Also write data/processed/<name>.csv next to each dataset (for spreadsheets etc.)
+EXPORT_CSV = os.getenv("EXPORT_CSV", "0") == "1"
+
+PARTITION_COL = "SEASON"
+# Preserves the writer's row order (train/test splits depend on it)
+ROW_ID = "__row_id"
+
+# Explicit types for identifier / text columns; everything else numeric is float64
+COLUMN_TYPES = {
+    "SEASON": pa.string(),
+    "SEASON_ID": pa.string(),
+    "GAME_ID": pa.string(),
+    "GAME_DATE": pa.timestamp("ns"),
+    "PLAYER_ID": pa.int64(),
+    "PLAYER_NAME": pa.string(),
+    "TEAM_ID": pa.int64(),
+    "TEAM_ABBREVIATION": pa.string(),
+    "TEAM_NAME": pa.string(),
+    "MATCHUP": pa.string(),
+    "WL": pa.string(),
+    "OPPONENT_TEAM": pa.string(),
+    "ANOMALY_TYPE": pa.string(),
+    "CUTOFF": pa.timestamp("ns"),
+    "INGESTED_AT": pa.timestamp("us", tz="UTC"),
+}
+
+
+def dataset_path(name: str) -> Path:
+    return STORE_DIR / name
+
+
+def schema_for(df: pd.DataFrame) -> pa.Schema:
+    fields = []
+    for col in df.columns:
+        if col in COLUMN_TYPES:
+            typ = COLUMN_TYPES[col]
+        elif pd.api.types.is_bool_dtype(df[col]):
+            typ = pa.bool_()
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            typ = pa.float64()
+        else:
+            typ = pa.string()
+        fields.append(pa.field(col, typ))
+    fields.append(pa.field(ROW_ID, pa.int64()))
+    return pa.schema(fields, metadata={"column_order": json.dumps(list(df.columns))})
+
+
+def write_dataset(df: pd.DataFrame, name: str) -> Path:
+    """
+    Replaces dataset `name` with df as Parquet, partitioned by SEASON when the
+    column exists, using the explicit schema from schema_for().
+    """
+    path = dataset_path(name)
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+
+    schema = schema_for(df)
+    table = pa.Table.from_pandas(
+        df.assign(**{ROW_ID: range(len(df))}),
+        schema=schema,
+        preserve_index=False,
+    )
+
+    partition_cols = [PARTITION_COL] if PARTITION_COL in df.columns else None
+    pq.write_to_dataset(table, path, partition_cols=partition_cols)
+    (path / "_schema.json").write_text(schema.metadata[b"column_order"].decode("utf-8"))
+
+    print(f"Saved {len(df)} rows to feature store dataset {path}")
+
+    if EXPORT_CSV:
+        csv_path = ROOT / "data" / "processed" / f"{name}.csv"
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(csv_path, index=False)
+        print(f"Exported {name} to {csv_path}")
+
+    return path
+
+
+def read_dataset(name: str, columns=None, filters=None) -> pd.DataFrame:
+    """
+    Reads dataset `name` in its original row and column order.
+    `columns` projects columns; `filters` uses pyarrow's DNF form, e.g.
+    [("SEASON", "in", ["2023-24", "2024-25"])], and prunes season partitions.
+    """
+    path = dataset_path(name)
+    if not path.exists():
+        raise FileNotFoundError(f"Feature store dataset not found: {path}")
+
+    column_order = json.loads((path / "_schema.json").read_text(encoding="utf-8"))
+    partitioning = (
+        ds.partitioning(pa.schema([(PARTITION_COL, pa.string())]), flavor="hive")
+        if PARTITION_COL in column_order else None
+    )
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning)
+
+    wanted = [c for c in column_order if columns is None or c in columns]
+    missing = set(columns or []) - set(column_order)
+    if missing:
+        raise KeyError(f"Columns not in dataset {name}: {sorted(missing)}")
+
+    table = dataset.to_table(
+        columns=wanted + [ROW_ID],
+        filter=pq.filters_to_expression(filters) if filters else None,
+    )
+    df = table.to_pandas()
+    df = df.sort_values(ROW_ID, kind="stable").drop(columns=ROW_ID).reset_index(drop=True)
+    return df[wanted]
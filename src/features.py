@@ -1,7 +1,18 @@
+import os
 import sqlite3
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from feature_specs import OFFLINE_FEATURES, rolling_features
+from feature_store import read_dataset, write_dataset
+from asof_ranks import AsOfRanks
+from opponent_store import OpponentDefenseStore
+
+# "asof" (default): opponent context from games before each row's date only, so
+# nothing after the game leaks into training. "season": whole-season averages.
+AS_OF_RANKS = os.getenv("OPPONENT_RANKS", "asof") != "season"
+
 def load_raw_from_sqlite(db_path="nba.db"):
     conn = sqlite3.connect(db_path)
     df = pd.read_sql("SELECT * FROM game_logs", conn)
@@ -16,33 +27,34 @@ def fetch_opponent(matchup: str) -> str:
         return parts[-1]
     return None
 
-def add_opponent_def_features(df: pd.DataFrame) -> pd.DataFrame:
-    df["OPPONENT_TEAM"] = df["MATCHUP"].apply(fetch_opponent)
-    opponent_defense = (
-        df.groupby(["SEASON", "OPPONENT_TEAM"])
-        .agg(
-            OPP_PTS_ALLOWED=("PTS", "mean"),
-            OPP_REB_ALLOWED=("REB", "mean"),
-            OPP_AST_ALLOWED=("AST", "mean"),
-        )
-        .reset_index()
-    )
-
-    opponent_defense["OPP_PTS_ALLOWED_RANK"] = (
-        opponent_defense.groupby("SEASON")["OPP_PTS_ALLOWED"]
-        .rank(method="dense", ascending=True)
-    )
-    opponent_defense["OPP_REB_ALLOWED_RANK"] = (
-        opponent_defense.groupby("SEASON")["OPP_REB_ALLOWED"]
-        .rank(method="dense", ascending=True)
-    )
-    opponent_defense["OPP_AST_ALLOWED_RANK"] = (
-        opponent_defense.groupby("SEASON")["OPP_AST_ALLOWED"]
-        .rank(method="dense", ascending=True)
-    )
+def parse_opponents(matchups: pd.Series) -> pd.Series:
+    # Only a few thousand distinct matchup strings exist (30 teams x home/away),
+    # so parse each distinct value once and broadcast through the factor codes
+    codes, uniques = pd.factorize(matchups)
+    lookup = np.array([fetch_opponent(m) for m in uniques] + [None], dtype=object)
+    return pd.Series(lookup[codes], index=matchups.index)
+
+def add_opponent_def_features(
+    df: pd.DataFrame, store: OpponentDefenseStore = None, as_of: bool = AS_OF_RANKS
+) -> pd.DataFrame:
+    df["OPPONENT_TEAM"] = parse_opponents(df["MATCHUP"])
+    if as_of:
+        context = AsOfRanks().fit(df).lookup(df)
+        # Before a team's first game of the season there is no rank yet: use the
+        # middle of the table rather than NaN, which older estimators reject
+        n_teams = df.groupby("SEASON")["OPPONENT_TEAM"].transform("nunique")
+        ranks = [col for col in context.columns if col.endswith("_RANK")]
+        context[ranks] = context[ranks].apply(lambda col: col.fillna((n_teams + 1) / 2))
+        return pd.concat([df, context], axis=1)
+
+    # Season-level defense context comes from the running totals in `store`:
+    # only new / corrected box scores are applied, ranks cover ~30 teams per season
+    if store is None:
+        store = OpponentDefenseStore()
+    store.update(df)
 
     df = df.merge(
-        opponent_defense,
+        store.allowed(),
         on=["SEASON", "OPPONENT_TEAM"],
         how="left",
     )
@@ -50,17 +62,18 @@ def add_opponent_def_features(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+def engineer_features(
+    df: pd.DataFrame, opponent_store: OpponentDefenseStore = None, as_of: bool = AS_OF_RANKS
+) -> pd.DataFrame:
     df["GAME_DATE"] = pd.to_datetime(df["GAME_DATE"])
-    df = add_opponent_def_features(df)
+    df = add_opponent_def_features(df, opponent_store, as_of)
     df = df.sort_values(["PLAYER_NAME", "GAME_DATE"])
     group = df.groupby("PLAYER_NAME")
 
-    # Calculation of rolling averages for last 5 games 
-    df["PTS_LAST5"] = group["PTS"].rolling(5, min_periods=1).mean().reset_index(level=0, drop=True)
-    df["REB_LAST5"] = group["REB"].rolling(5, min_periods=1).mean().reset_index(level=0, drop=True)
-    df["AST_LAST5"] = group["AST"].rolling(5, min_periods=1).mean().reset_index(level=0, drop=True)
-    df["MIN_LAST5"] = group["MIN"].rolling(5, min_periods=1).mean().reset_index(level=0, drop=True)
+    # Rolling features from the shared registry (last 5 game averages), one pass
+    rolled = rolling_features(df, OFFLINE_FEATURES, by="PLAYER_NAME")
+    for col in rolled.columns:
+        df[col] = rolled[col]
 
     df["PRA_LAST5"] = df["PTS_LAST5"] + df["REB_LAST5"] + df["AST_LAST5"]
 
@@ -71,19 +84,33 @@ def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-def save_features(df: pd.DataFrame, out_path="data/processed/features.csv"):
-    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_path, index=False)
-    print(f"Saved feature dataset to {out_path}")
+def save_features(df: pd.DataFrame, name="features"):
+    # Parquet partitioned by season (CSV copy only with EXPORT_CSV=1)
+    write_dataset(df, name)
 
-if __name__ == "__main__":
-    root = Path(__file__).resolve().parents[1]
-    db_path = root / "nba.db"
+def load_cached(name="features") -> pd.DataFrame:
+    return read_dataset(name)
 
-    df_raw = load_raw_from_sqlite(str(db_path))
+def main(df_raw: pd.DataFrame = None) -> pd.DataFrame:
+    # df_raw comes in memory from ingest when run by pipeline.py
+    if df_raw is None:
+        root = Path(__file__).resolve().parents[1]
+        db_path = root / "nba.db"
+        df_raw = load_raw_from_sqlite(str(db_path))
 
-    df_features = engineer_features(df_raw)
+    opponent_store = None
+    if not AS_OF_RANKS:
+        opponent_store = OpponentDefenseStore.restore()
+        if opponent_store.is_stale(df_raw):
+            print("Opponent defense store has rows missing from the input, rebuilding it")
+            opponent_store = OpponentDefenseStore()
 
-    save_path = root / "data" / "processed" / "features.csv"
-    save_features(df_features, str(save_path))
+    df_features = engineer_features(df_raw.copy(), opponent_store)
+    if opponent_store is not None:
+        opponent_store.checkpoint()
 
+    save_features(df_features)
+    return df_features
+
+if __name__ == "__main__":
+    main()
@@ -3,18 +3,14 @@ import sqlite3
 from pathlib import Path
 
 import pandas as pd
-from nba_api.stats.endpoints import leaguegamelog
+
+from api_cache import league_game_log
 
 # function to fetch player game logs
-def fetch_player_game_logs(season: str) -> pd.DataFrame:
+def fetch_player_game_logs(season: str, on_miss=None) -> pd.DataFrame:
     # using nba_api fetch all player logs from chosen season
-    player_logs = leaguegamelog.LeagueGameLog(
-        season=season,
-        season_type_all_star="Regular Season",
-        player_or_team_abbreviation="P",
-    )
-    # specify index 0
-    df = player_logs.get_data_frames()[0]
+    # (served from the on-disk cache for seasons already downloaded)
+    df = league_game_log(season, on_miss=on_miss)
     df["SEASON"] = season
     return df
 
@@ -23,10 +19,9 @@ def fetch_multiple_season_logs(seasons) -> pd.DataFrame:
     all_dfs = []
     # for loop to cycle through seasons
     for i in seasons:
-        df_i = fetch_player_game_logs(i)
+        # sleep before network requests for api to not be overworked
+        df_i = fetch_player_game_logs(i, on_miss=lambda: time.sleep(1))
         all_dfs.append(df_i)
-        # sleep for api to not be overworked
-        time.sleep(1)
         # concatonate all seasons to one dataframe
     return pd.concat(all_dfs, ignore_index=True)
 
@@ -41,15 +36,26 @@ def write_to_sqlite(df: pd.DataFrame, db_path: str= "nba.db", table_name: str =
     print("Done writing to SQLite.")
 
 
-if __name__ == "__main__":
+def load_cached(db_path: str = None) -> pd.DataFrame:
+    # Raw logs from the last run (used when pipeline.py skips this step)
+    db_path = db_path or str(Path(__file__).resolve().parents[1] / "nba.db")
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql("SELECT * FROM game_logs", conn)
+    conn.close()
+    return df
+
+
+# Seasons ran by project, for this project I just used 2024-2025 and 2023-2024
+SEASONS = [
+    "2024-25",
+    "2023-24",
+]
+
+
+def main(seasons=SEASONS) -> pd.DataFrame:
     # Project Root
     root = Path(__file__).resolve().parents[1]
 
-    # Seasons ran by project, for this project I just used 2024-2025 and 2023-2024
-    seasons = [
-        "2024-25",
-        "2023-24",
-    ]
     # fetch the game logs and store them in df_logs
     df_logs = fetch_multiple_season_logs(seasons)
 
@@ -66,4 +72,10 @@ if __name__ == "__main__":
 
     # write to SQLite DB
     db_path = root / "nba.db"
-    write_to_sqlite(df_logs, db_path=str(db_path))
\ No newline at end of file
+    write_to_sqlite(df_logs, db_path=str(db_path))
+
+    return df_logs
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,19 @@
+import io
 import os
 import time
 import random
+from pathlib import Path
 from datetime import datetime, timezone, timedelta, date
 
 import pandas as pd
-from nba_api.stats.endpoints import leaguegamelog
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from api_cache import OfflineCacheMiss, league_game_log, season_span
+from obs import log_run
+from rate_limit import TokenBucket
 
 # ===============================
 # Configuration (env-driven)
@@ -16,73 +22,462 @@ import uuid
 SEASONS = os.getenv("SEASONS", "2025-26").split(",")
 FULL_REFRESH = os.getenv("FULL_REFRESH", "0") == "1"
 LOOKBACK_DAYS = int(os.getenv("LOOKBACK_DAYS", "14"))
+# Incremental runs start from what bronze already holds (latest GAME_DATE per
+# season, last successful bronze run) minus a margin for late stat corrections,
+# instead of a fixed LOOKBACK_DAYS window. ADAPTIVE_LOOKBACK=0 restores the latter.
+ADAPTIVE_LOOKBACK = os.getenv("ADAPTIVE_LOOKBACK", "1") == "1"
+CORRECTION_MARGIN_DAYS = int(os.getenv("CORRECTION_MARGIN_DAYS", "2"))
+# Full refresh is fetched and staged one date window at a time
+FULL_REFRESH_WINDOW_DAYS = int(os.getenv("FULL_REFRESH_WINDOW_DAYS", "7"))
+# Windows fetched concurrently; all workers share one token bucket so the
+# request rate against stats.nba.com stays at FETCH_RATE per second
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+FETCH_RATE = float(os.getenv("FETCH_RATE", "1.0"))
+FETCH_BURST = int(os.getenv("FETCH_BURST", "1"))
+# "copy" streams frames through COPY into a typed staging table,
+# "to_sql" is the original pandas INSERT path (kept for benchmarking)
+BRONZE_LOADER = os.getenv("BRONZE_LOADER", "copy")
+
+BRONZE_SQL = Path(__file__).resolve().parents[1] / "sql" / "03_bronze_player_game_logs.sql"
+
+# Column order of bronze.player_game_logs_stage (LeagueGameLog player result set + ours)
+BRONZE_COLUMNS = [
+    "SEASON_ID", "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION",
+    "TEAM_NAME", "GAME_ID", "GAME_DATE", "MATCHUP", "WL", "MIN",
+    "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+    "OREB", "DREB", "REB", "AST", "STL", "BLK", "TOV", "PF", "PTS",
+    "PLUS_MINUS", "FANTASY_PTS", "VIDEO_AVAILABLE", "SEASON", "INGESTED_AT",
+]
+
+_COLUMN_LIST = ", ".join(f'"{c}"' for c in BRONZE_COLUMNS)
+
+KEY_COLUMNS = ["SEASON", "GAME_ID", "PLAYER_ID"]
+# What a box score "says": everything but the key, our load metadata and
+# VIDEO_AVAILABLE (flips when video is published, not a stat change)
+PAYLOAD_COLUMNS = [
+    c for c in BRONZE_COLUMNS
+    if c not in KEY_COLUMNS + ["INGESTED_AT", "VIDEO_AVAILABLE"]
+]
+
+
+def payload_hash(alias: str) -> str:
+    # Hashed from the typed staging columns, so pandas dtype drift between
+    # fetches (int vs float for the same value) cannot look like a change
+    return "md5(ROW(" + ", ".join(f'{alias}."{c}"' for c in PAYLOAD_COLUMNS) + ")::text)"
+
+
+def payload_json(alias: str) -> str:
+    return "jsonb_build_object(" + ", ".join(f"'{c}', {alias}.\"{c}\"" for c in PAYLOAD_COLUMNS) + ")"
+
+
+_UPDATE_LIST = ",\n        ".join(
+    f'"{c}" = EXCLUDED."{c}"' for c in BRONZE_COLUMNS if c not in KEY_COLUMNS
+)
+
+# Run once per staged season against that season's partition only. Conflicting
+# rows are rewritten only when their payload hash changed, so unchanged
+# lookback rows keep their INGESTED_AT and create no dead tuples.
+UPSERT_SQL = f"""
+    INSERT INTO bronze.{{partition}} AS t ({_COLUMN_LIST}, "ROW_HASH")
+    SELECT {_COLUMN_LIST}, {payload_hash("s")}
+    FROM bronze.player_game_logs_stage s
+    WHERE s."SEASON" = :season
+    ON CONFLICT ("SEASON","GAME_ID","PLAYER_ID")
+    DO UPDATE SET
+        {_UPDATE_LIST},
+        "ROW_HASH" = EXCLUDED."ROW_HASH"
+    WHERE t."ROW_HASH" IS DISTINCT FROM EXCLUDED."ROW_HASH";
+"""
+
+# Runs before UPSERT_SQL: staged rows that differ from a hashed bronze row
+CORRECTIONS_SQL = f"""
+    INSERT INTO bronze.player_game_log_corrections
+      ("SEASON", "GAME_ID", "PLAYER_ID", old_hash, new_hash, changed_columns, old_values, new_values)
+    SELECT
+      s."SEASON",
+      s."GAME_ID",
+      s."PLAYER_ID",
+      s.old_hash,
+      s.new_hash,
+      ARRAY(
+        SELECT n.key FROM jsonb_each(s.new_values) n
+        WHERE n.value IS DISTINCT FROM s.old_values -> n.key
+        ORDER BY n.key
+      ),
+      s.old_values,
+      s.new_values
+    FROM (
+      SELECT
+        n."SEASON",
+        n."GAME_ID",
+        n."PLAYER_ID",
+        t."ROW_HASH" AS old_hash,
+        {payload_hash("n")} AS new_hash,
+        {payload_json("t")} AS old_values,
+        {payload_json("n")} AS new_values
+      FROM bronze.player_game_logs_stage n
+      JOIN bronze.{{partition}} t
+        ON t."SEASON" = n."SEASON"
+       AND t."GAME_ID" = n."GAME_ID"
+       AND t."PLAYER_ID" = n."PLAYER_ID"
+      WHERE n."SEASON" = :season
+        AND t."ROW_HASH" IS NOT NULL
+    ) s
+    WHERE s.old_hash <> s.new_hash;
+"""
 
 
 # ===============================
 # Fetch Logic
 # ===============================
 
-def fetch_season_once(season: str) -> pd.DataFrame:
+def season_bounds(season: str):
+    """
+    Calendar span searched for a season (api_cache.season_span), capped at
+    today for the season in progress.
+    """
+    start, end = season_span(season)
+    return start, min(end, date.today())
+
+
+LAST_SUCCESS_SQL = """
+    SELECT max(executed_at)
+    FROM gold.pipeline_run_log
+    WHERE layer = 'bronze' AND status = 'success';
+"""
+
+MAX_GAME_DATE_SQL = """
+    SELECT "SEASON", max("GAME_DATE"::date)
+    FROM bronze.player_game_logs
+    WHERE "SEASON" = ANY(:seasons)
+    GROUP BY "SEASON";
+"""
+
+
+REQUEUED_WINDOWS_SQL = """
+    SELECT "SEASON", date_from, date_to
+    FROM bronze.failed_windows
+    WHERE "SEASON" = ANY(:seasons)
+    ORDER BY "SEASON", date_from;
+"""
+
+RECORD_FAILED_WINDOW_SQL = """
+    INSERT INTO bronze.failed_windows ("SEASON", date_from, date_to)
+    VALUES (:season, :date_from, :date_to)
+    ON CONFLICT ("SEASON", date_from, date_to)
+    DO UPDATE SET
+        attempts = bronze.failed_windows.attempts + 1,
+        last_failed_at = now();
+"""
+
+# A loaded window clears every recorded failure it overlaps: the rest of such
+# a failure was fetched in the same run (requeued_tasks) and, if that part
+# failed again, is recorded as a window of its own
+CLEAR_FAILED_WINDOWS_SQL = """
+    DELETE FROM bronze.failed_windows
+    WHERE "SEASON" = :season
+      AND date_from <= :date_to
+      AND date_to >= :date_from;
+"""
+
+
+def incremental_starts(engine, seasons) -> dict:
+    """
+    First date to fetch per season on an incremental run: the latest game
+    already in bronze, or the last successful bronze run if that is earlier,
+    minus CORRECTION_MARGIN_DAYS. Seasons with no bronze rows, and every
+    season while no run has succeeded yet (e.g. the first backfill ended
+    partial), start at the beginning of the season.
+    """
+    with engine.connect() as conn:
+        last_success = conn.execute(text(LAST_SUCCESS_SQL)).scalar()
+        max_dates = dict(conn.execute(text(MAX_GAME_DATE_SQL), {"seasons": list(seasons)}).all())
+
+    margin = timedelta(days=CORRECTION_MARGIN_DAYS)
+    starts = {}
+    for season in seasons:
+        latest = max_dates.get(season)
+        if latest is None or last_success is None:
+            starts[season] = season_bounds(season)[0]
+            continue
+        latest = min(latest, last_success.astimezone(timezone.utc).date())
+        starts[season] = latest - margin
+    return starts
+
+
+def uncovered(window, covered) -> list:
+    """Parts of `window` outside every (start, end) window in `covered`."""
+    pieces = [window]
+    for c_start, c_end in covered:
+        remaining = []
+        for start, end in pieces:
+            if end < c_start or c_end < start:
+                remaining.append((start, end))
+                continue
+            if start < c_start:
+                remaining.append((start, c_start - timedelta(days=1)))
+            if c_end < end:
+                remaining.append((c_end + timedelta(days=1), end))
+        pieces = remaining
+    return pieces
+
+
+def requeued_tasks(engine, seasons, tasks) -> list:
     """
-    Makes a single API request for a season.
-    Used by retry wrapper.
+    Previously failed windows, clipped to the dates `tasks` (and earlier
+    requeued windows) do not already fetch. Overlapping fetches would stage
+    the same rows twice, which the per-partition upsert cannot apply.
     """
-    start_date = (date.today() - timedelta(days=LOOKBACK_DAYS)).isoformat()
-    end_date = date.today().isoformat()
+    with engine.connect() as conn:
+        rows = conn.execute(text(REQUEUED_WINDOWS_SQL), {"seasons": list(seasons)}).all()
+
+    covered = {}
+    for season, window in tasks:
+        covered.setdefault(season, []).append(window)
+    requeued = []
+    for season, date_from, date_to in rows:
+        pieces = uncovered((date_from, date_to), covered.get(season, []))
+        covered.setdefault(season, []).extend(pieces)
+        requeued.extend((season, piece) for piece in pieces)
+    return requeued
+
+
+def record_windows(engine, tasks, failed):
+    """Remembers windows that failed and forgets those now loaded."""
+    failed_set = set(failed)
+    with engine.begin() as conn:
+        for season, (start, end) in tasks:
+            params = {"season": season, "date_from": start, "date_to": end}
+            if (season, (start, end)) in failed_set:
+                conn.execute(text(RECORD_FAILED_WINDOW_SQL), params)
+            else:
+                conn.execute(text(CLEAR_FAILED_WINDOWS_SQL), params)
+
+
+def slice_windows(start: date, end: date, days: int):
+    step = timedelta(days=days)
+    while start <= end:
+        stop = min(start + step - timedelta(days=1), end)
+        yield start, stop
+        start = stop + timedelta(days=1)
 
+
+def iter_windows(season: str, start: date = None):
+    """
+    Date windows to request for a season. Full refresh walks the season in
+    FULL_REFRESH_WINDOW_DAYS slices. Incremental runs fetch from `start`
+    (see incremental_starts), or the last LOOKBACK_DAYS without one, as a
+    single window unless that spans more than LOOKBACK_DAYS.
+    """
+    season_start, season_end = season_bounds(season)
     if FULL_REFRESH:
-        print(f"[{season}] FULL refresh (entire season)")
-        resp = leaguegamelog.LeagueGameLog(
-            season=season,
-            season_type_all_star="Regular Season",
-            player_or_team_abbreviation="P",
-            timeout=120,
-        )
-    else:
-        print(
-            f"[{season}] Incremental refresh "
-            f"(last {LOOKBACK_DAYS} days: {start_date} → {end_date})"
-        )
-        resp = leaguegamelog.LeagueGameLog(
-            season=season,
-            season_type_all_star="Regular Season",
-            player_or_team_abbreviation="P",
-            date_from_nullable=start_date,
-            date_to_nullable=end_date,
-            timeout=120,
-        )
-
-    df = resp.get_data_frames()[0]
+        yield from slice_windows(season_start, season_end, FULL_REFRESH_WINDOW_DAYS)
+        return
+
+    if start is None:
+        yield date.today() - timedelta(days=LOOKBACK_DAYS), date.today()
+        return
+
+    start, end = max(start, season_start), season_end
+    if (end - start).days < LOOKBACK_DAYS:
+        if start <= end:
+            yield start, end
+        return
+    yield from slice_windows(start, end, FULL_REFRESH_WINDOW_DAYS)
+
+
+def window_label(season: str, window) -> str:
+    start, end = window
+    return f"{season}[{start.isoformat()}..{end.isoformat()}]"
+
+
+def fetch_season_once(season: str, window, limiter: TokenBucket = None) -> pd.DataFrame:
+    """
+    Makes a single API request for one date window of a season.
+    Used by retry wrapper. Served from the on-disk response cache when fresh;
+    only real network requests take a token from `limiter`.
+    """
+    start_date, end_date = (d.isoformat() for d in window)
+
+    mode = "FULL refresh" if FULL_REFRESH else "Incremental refresh"
+    print(f"[{season}] {mode} ({start_date} → {end_date})")
+
+    df = league_game_log(
+        season,
+        date_from=start_date,
+        date_to=end_date,
+        timeout=120,
+        on_miss=limiter.acquire if limiter is not None else None,
+    )
     df["SEASON"] = season
     df["INGESTED_AT"] = datetime.now(timezone.utc)
 
     return df
 
 
-def fetch_season(season: str, max_retries: int = 4, base_sleep: float = 2.0) -> pd.DataFrame:
+def fetch_season(
+    season: str,
+    window,
+    max_retries: int = 4,
+    base_sleep: float = 2.0,
+    limiter: TokenBucket = None,
+) -> pd.DataFrame:
     """
     Retry wrapper with exponential backoff.
     Protects CI from flaky API timeouts.
     Returns None if all retries fail (instead of crashing).
+    Every network attempt (including retries) takes a token from `limiter` if given.
     """
     last_err = None
+    label = window_label(season, window)
 
     for attempt in range(1, max_retries + 1):
         try:
-            return fetch_season_once(season)
+            return fetch_season_once(season, window, limiter=limiter)
+
+        except OfflineCacheMiss:
+            # Deterministic: no backoff, fail the run
+            raise
 
         except Exception as e:
             last_err = e
             sleep_s = base_sleep * (2 ** (attempt - 1)) + random.uniform(0, 1.0)
-            print(f"⚠️ [{season}] fetch failed (attempt {attempt}/{max_retries}): {e}")
+            print(f"⚠️ {label} fetch failed (attempt {attempt}/{max_retries}): {e}")
             print(f"   sleeping {sleep_s:.1f}s then retrying...")
             time.sleep(sleep_s)
 
     # After all retries failed, log and return None (don't crash)
-    print(f"❌ [{season}] Failed to fetch after {max_retries} retries: {last_err}")
+    print(f"❌ {label} Failed to fetch after {max_retries} retries: {last_err}")
     return None
 
 
+def iter_chunks(tasks, failed: list, workers: int = FETCH_WORKERS, limiter: TokenBucket = None):
+    """
+    Fetches (season, window) tasks on a thread pool bounded by a shared rate
+    limiter and yields each frame as soon as it arrives. At most 2 * workers
+    windows are in flight, so memory stays bounded by the chunk size.
+    (season, window) tasks that exhaust their retries are appended to `failed`.
+    """
+    if limiter is None:
+        limiter = TokenBucket(FETCH_RATE, FETCH_BURST)
+
+    workers = max(1, workers)
+    pending = iter(tasks)
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(in_flight) < 2 * workers:
+                task = next(pending, None)
+                if task is None:
+                    break
+                season, window = task
+                in_flight[pool.submit(fetch_season, season, window, limiter=limiter)] = task
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                season, window = in_flight.pop(future)
+                df = future.result()
+                if df is None:
+                    failed.append((season, window))
+                    continue
+                yield df
+
+
+# ===============================
+# Load Logic
+# ===============================
+
+def ensure_bronze_tables(engine):
+    with engine.begin() as conn:
+        conn.execute(text(BRONZE_SQL.read_text(encoding="utf-8")))
+
+
+def copy_frame(cursor, df: pd.DataFrame) -> int:
+    """
+    Streams one DataFrame into the staging table with COPY ... FROM STDIN.
+    Columns the API did not return are sent as NULL, unknown ones are dropped.
+    """
+    buf = io.StringIO()
+    df.reindex(columns=BRONZE_COLUMNS).to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    cursor.copy_expert(
+        f"COPY bronze.player_game_logs_stage ({_COLUMN_LIST}) FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+    return len(df)
+
+
+def upsert_stage(conn) -> dict:
+    """
+    Upserts the staged rows season by season, each directly into its bronze
+    partition (created if this is the season's first load), recording stat
+    corrections first. Returns {season: (rows inserted or changed, corrections)}.
+    """
+    seasons = conn.execute(text("""
+        SELECT DISTINCT "SEASON" FROM bronze.player_game_logs_stage
+        WHERE "SEASON" IS NOT NULL;
+    """)).scalars().all()
+
+    upserted = {}
+    for season in sorted(seasons):
+        partition = conn.execute(
+            text("SELECT bronze.ensure_season_partition(:season);"), {"season": season}
+        ).scalar()
+        params = {"season": season}
+        corrections = conn.execute(
+            text(CORRECTIONS_SQL.format(partition=f'"{partition}"')), params
+        ).rowcount
+        changed = conn.execute(text(UPSERT_SQL.format(partition=f'"{partition}"')), params).rowcount
+        upserted[season] = (changed, corrections)
+    return upserted
+
+
+def load_stage_copy(engine, frames) -> int:
+    """
+    Truncates the staging table and COPYs every frame into it in one transaction.
+    `frames` can be any iterable, so callers may stream chunks as they arrive.
+    """
+    ensure_bronze_tables(engine)
+    rows = 0
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bronze.player_game_logs_stage;"))
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            for df in frames:
+                rows += copy_frame(cursor, df)
+        finally:
+            cursor.close()
+    return rows
+
+
+def load_stage_to_sql(engine, df: pd.DataFrame) -> int:
+    """
+    Original loader: pandas INSERTs into a freshly inferred temp table,
+    then copied into the typed staging table for the shared upsert.
+    """
+    ensure_bronze_tables(engine)
+    df.to_sql(
+        "player_game_logs_tmp",
+        engine,
+        schema="bronze",
+        if_exists="replace",
+        index=False
+    )
+    cols = ", ".join(f'"{c}"' for c in BRONZE_COLUMNS if c in df.columns)
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE bronze.player_game_logs_stage;"))
+        conn.execute(text(f"""
+            INSERT INTO bronze.player_game_logs_stage ({cols})
+            SELECT {cols} FROM bronze.player_game_logs_tmp;
+        """))
+        conn.execute(text("DROP TABLE bronze.player_game_logs_tmp;"))
+    return len(df)
+
+
 # ===============================
 # Main Bronze Load
 # ===============================
@@ -100,21 +495,43 @@ def main():
     print(f"run_id: {run_id}")
     print(f"Seasons: {SEASONS}")
     print(f"FULL_REFRESH: {FULL_REFRESH}")
-    print(f"LOOKBACK_DAYS: {LOOKBACK_DAYS}")
+    print(f"LOOKBACK_DAYS: {LOOKBACK_DAYS} (adaptive: {ADAPTIVE_LOOKBACK}, margin {CORRECTION_MARGIN_DAYS}d)")
+    if FULL_REFRESH:
+        print(f"FULL_REFRESH_WINDOW_DAYS: {FULL_REFRESH_WINDOW_DAYS}")
+    print(f"BRONZE_LOADER: {BRONZE_LOADER}")
+    print(f"FETCH_WORKERS: {FETCH_WORKERS} (rate {FETCH_RATE}/s, burst {FETCH_BURST})")
+
+    ensure_bronze_tables(engine)
+    starts = {}
+    if ADAPTIVE_LOOKBACK and not FULL_REFRESH:
+        starts = incremental_starts(engine, SEASONS)
+        for season, start in starts.items():
+            print(f"[{season}] Fetching from {start.isoformat()}")
+
+    tasks = [(season, window) for season in SEASONS for window in iter_windows(season, starts.get(season))]
+    for season, window in requeued_tasks(engine, SEASONS, tasks):
+        print(f"Retrying previously failed window {window_label(season, window)}")
+        tasks.append((season, window))
+    if not tasks:
+        print("✓ Bronze is up to date for all seasons, nothing to fetch")
+        log_run(engine, run_id, layer="bronze", status="success", runtime=time.time() - start_time, rows=0)
+        return
+    failed_windows = []
+    chunks = iter_chunks(tasks, failed_windows)
 
-    all_dfs = []
-    failed_seasons = []
+    # Chunks are written to staging as they arrive, so a full refresh never
+    # holds more than a few windows in memory
+    if BRONZE_LOADER == "copy":
+        rows = load_stage_copy(engine, chunks)
+    else:
+        frames = list(chunks)
+        rows = load_stage_to_sql(engine, pd.concat(frames, ignore_index=True)) if frames else 0
 
-    for season in SEASONS:
-        df = fetch_season(season)
-        if df is None:
-            failed_seasons.append(season)
-            continue
-        all_dfs.append(df)
-        time.sleep(1)  # light throttle between seasons
+    failed_labels = [window_label(season, window) for season, window in failed_windows]
 
-    if not all_dfs:
-        print("⚠️ No data fetched - API unavailable or all seasons failed.")
+    if len(failed_windows) == len(tasks):
+        print("⚠️ No data fetched - API unavailable or all windows failed.")
+        record_windows(engine, tasks, failed_windows)
         runtime = time.time() - start_time
         with engine.begin() as conn:
             conn.execute(text("""
@@ -125,63 +542,27 @@ def main():
             """), {
                 "run_id": run_id, 
                 "runtime": runtime,
-                "msg": f"API timeout - failed seasons: {','.join(failed_seasons)}"
+                "msg": f"API timeout - failed windows: {','.join(failed_labels)}"
             })
         # Exit with 0 so CI doesn't fail
         return
 
-    df_all = pd.concat(all_dfs, ignore_index=True)
-    rows = len(df_all)
-    print(f"✓ Rows fetched: {rows}")
+    print(f"✓ Rows fetched: {rows} ({len(tasks) - len(failed_windows)}/{len(tasks)} windows)")
     
-    if failed_seasons:
-        print(f"⚠️ Some seasons failed: {failed_seasons}")
-
-    # ... rest of your upsert logic ...
-    
-    # Write to temp table
-    df_all.to_sql(
-        "player_game_logs_tmp",
-        engine,
-        schema="bronze",
-        if_exists="replace",
-        index=False
-    )
+    if failed_windows:
+        print(f"⚠️ Some windows failed: {failed_labels}")
 
-    # Upsert into permanent table
+    # Upsert into permanent table, one season partition at a time
     with engine.begin() as conn:
-        conn.execute(text("""
-            CREATE TABLE IF NOT EXISTS bronze.player_game_logs AS
-            SELECT * FROM bronze.player_game_logs_tmp WHERE 1=0;
-        """))
-
-        conn.execute(text("""
-            DO $$
-            BEGIN
-                IF NOT EXISTS (
-                    SELECT 1 FROM pg_constraint
-                    WHERE conname = 'bronze_game_logs_unique'
-                ) THEN
-                    ALTER TABLE bronze.player_game_logs
-                    ADD CONSTRAINT bronze_game_logs_unique
-                    UNIQUE ("SEASON","GAME_ID","PLAYER_ID");
-                END IF;
-            END$$;
-        """))
-
-        conn.execute(text("""
-            INSERT INTO bronze.player_game_logs
-            SELECT * FROM bronze.player_game_logs_tmp
-            ON CONFLICT ("SEASON","GAME_ID","PLAYER_ID")
-            DO UPDATE SET
-                "INGESTED_AT" = EXCLUDED."INGESTED_AT";
-        """))
-
-        conn.execute(text("DROP TABLE bronze.player_game_logs_tmp;"))
+        upserted = upsert_stage(conn)
+    for season, (changed, corrections) in upserted.items():
+        print(f"✓ {season}: {changed} rows new or changed ({corrections} stat corrections), rest unchanged")
+    # Only after the upsert: a window counts as loaded once its rows are in bronze
+    record_windows(engine, tasks, failed_windows)
 
     runtime = time.time() - start_time
-    status = 'partial' if failed_seasons else 'success'
-    error_msg = f"Failed seasons: {','.join(failed_seasons)}" if failed_seasons else None
+    status = 'partial' if failed_windows else 'success'
+    error_msg = f"Failed windows: {','.join(failed_labels)}" if failed_windows else None
     
     with engine.begin() as conn:
         conn.execute(text("""
@@ -14,6 +14,9 @@ def main():
     sql_files = [
         root / "sql" / "00_schema.sql",
         root / "sql" / "01_pipeline_run_log.sql",
+        root / "sql" / "02_layer_watermarks.sql",
+        root / "sql" / "03_bronze_player_game_logs.sql",
+        root / "sql" / "04_quality_profiles.sql",
     ]
 
     with engine.begin() as conn:
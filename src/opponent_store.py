@@ -0,0 +1,134 @@
+import os
+import pickle
+import time
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+# Persisted between features runs so only new / corrected box scores are applied
+STORE_PATH = Path(os.getenv("OPPONENT_STORE_PATH", str(ROOT / "data" / "state" / "opponent_defense.pkl")))
+
+KEY = ["SEASON", "GAME_ID", "PLAYER_ID"]
+STATS = ["PTS", "REB", "AST"]
+ALLOWED = [f"OPP_{stat}_ALLOWED" for stat in STATS]
+
+
+class OpponentDefenseStore:
+    """
+    Running totals of what each team allows to opposing players, per
+    (SEASON, team), the Python counterpart of gold.opponent_season_totals.
+
+    A ledger keeps every box score's last counted contribution, so update()
+    touches only rows that are new or changed and applies them as differences
+    (re-ingested rows are not double counted). Averages are per box-score row;
+    ranks are recomputed over the ~30 teams of each season.
+    """
+
+    def __init__(self):
+        # (SEASON, GAME_ID, PLAYER_ID) -> last counted OPPONENT_TEAM / stats
+        self.ledger = pd.DataFrame(
+            columns=["OPPONENT_TEAM"] + STATS,
+            index=pd.MultiIndex.from_tuples([], names=KEY),
+        ).astype({stat: "float64" for stat in STATS})
+        # (SEASON, OPPONENT_TEAM) -> ROWS and stat totals
+        self.totals = pd.DataFrame(
+            columns=["ROWS"] + STATS,
+            index=pd.MultiIndex.from_tuples([], names=["SEASON", "OPPONENT_TEAM"]),
+            dtype="float64",
+        )
+        self.season_rows = Counter()
+
+    def update(self, df: pd.DataFrame) -> int:
+        """Applies new or changed box scores (needs OPPONENT_TEAM). Returns rows applied."""
+        rows = df[KEY + ["OPPONENT_TEAM"] + STATS].drop_duplicates(KEY, keep="last")
+        rows = rows.astype({stat: "float64" for stat in STATS}).fillna({stat: 0.0 for stat in STATS})
+        rows = rows.set_index(KEY)
+
+        seen = rows.index.isin(self.ledger.index)
+        old = self.ledger.reindex(rows.index)
+        same = (
+            seen
+            & old["OPPONENT_TEAM"].fillna("").eq(rows["OPPONENT_TEAM"].fillna("")).to_numpy()
+            & (old[STATS].to_numpy() == rows[STATS].to_numpy()).all(axis=1)
+        )
+        changed = rows[~same]
+        if changed.empty:
+            return 0
+        retracted = old[seen & ~same]
+
+        deltas = pd.concat([
+            changed.assign(ROWS=1.0),
+            retracted.assign(ROWS=-1.0, **{stat: -retracted[stat] for stat in STATS}),
+        ])
+        deltas = deltas.groupby(["SEASON", "OPPONENT_TEAM"])[["ROWS"] + STATS].sum()
+        self.totals = self.totals.add(deltas, fill_value=0.0)
+
+        is_new = ~changed.index.isin(self.ledger.index)
+        added = changed[is_new]
+        if len(added) < len(changed):
+            self.ledger.loc[changed.index[~is_new]] = changed[~is_new]
+        self.ledger = pd.concat([self.ledger, added]) if len(self.ledger) else added.copy()
+        self.season_rows.update(added.index.get_level_values("SEASON").value_counts().to_dict())
+        return len(changed)
+
+    def is_stale(self, df: pd.DataFrame) -> bool:
+        """True if the ledger holds box scores that df no longer has (rows deleted upstream)."""
+        counts = df.drop_duplicates(KEY).groupby("SEASON").size()
+        return any(self.season_rows[season] > n for season, n in counts.items())
+
+    def allowed(self) -> pd.DataFrame:
+        """Per (SEASON, OPPONENT_TEAM) averages allowed and their dense ranks within the season."""
+        totals = self.totals[self.totals["ROWS"] > 0]
+
+        out = totals[STATS].div(totals["ROWS"], axis=0)
+        out.columns = ALLOWED
+        out = out.sort_index().reset_index()
+        ranks = out.groupby("SEASON")[ALLOWED].rank(method="dense", ascending=True)
+        for col in ALLOWED:
+            out[f"{col}_RANK"] = ranks[col]
+        return out
+
+    def checkpoint(self, path=STORE_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+
+    @staticmethod
+    def restore(path=STORE_PATH) -> "OpponentDefenseStore":
+        """The persisted store, or an empty one if there is none yet."""
+        path = Path(path)
+        if not path.exists():
+            return OpponentDefenseStore()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+if __name__ == "__main__":
+    from features import parse_opponents
+    from synthetic import make_game_logs
+
+    history = make_game_logs(seasons=["2023-24", "2024-25"])
+    history["OPPONENT_TEAM"] = parse_opponents(history["MATCHUP"])
+
+    t0 = time.perf_counter()
+    store = OpponentDefenseStore()
+    store.update(history)
+    print(f"Initial build: {len(history)} rows in {time.perf_counter() - t0:.3f}s")
+
+    # A game day: one new game per team, plus the same rows re-ingested
+    last_day = history[history["GAME_DATE"] == history["GAME_DATE"].max()]
+    day = last_day.assign(GAME_ID=last_day["GAME_ID"] + "-next")
+    t0 = time.perf_counter()
+    applied = store.update(pd.concat([history, day]))
+    print(f"Game-day update: {applied} rows applied in {time.perf_counter() - t0:.3f}s (full frame re-offered)")
+
+    t0 = time.perf_counter()
+    store.update(last_day.assign(GAME_ID=last_day["GAME_ID"] + "-next2"))
+    allowed = store.allowed()
+    print(f"Delta-only update + ranks: {(time.perf_counter() - t0) * 1e3:.1f} ms")
+    print(allowed.head())
@@ -0,0 +1,40 @@
+import streamlit as st
+
+from dashboard_data import query, require_db_url, seasons
+
+st.set_page_config(page_title="League Leaders", layout="wide")
+
+db_url = require_db_url()
+
+st.title("League Leaders")
+
+STATS = {"Points": "pts", "Rebounds": "reb", "Assists": "ast", "Minutes": "minutes"}
+
+season = st.selectbox("Season", seasons(db_url))
+if season is None:
+    st.info("No rollups yet. Run the pipeline first.")
+    st.stop()
+stat_label = st.selectbox("Stat", list(STATS))
+min_games = st.slider("Minimum games", 1, 82, 20)
+
+stat = STATS[stat_label]
+df = query(
+    db_url,
+    f"""
+        SELECT
+          player_name,
+          team,
+          games,
+          round(({stat} / games)::numeric, 1) AS per_game,
+          {stat} AS total
+        FROM gold.player_season_totals
+        WHERE season = :season AND games >= :min_games
+        ORDER BY {stat} / games DESC NULLS LAST
+        LIMIT 25;
+    """,
+    {"season": season, "min_games": min_games},
+)
+
+st.subheader(f"{stat_label} per game, {season}")
+st.dataframe(df, width="stretch")
+st.bar_chart(df.set_index("player_name")["per_game"])
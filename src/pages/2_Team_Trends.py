@@ -0,0 +1,38 @@
+import streamlit as st
+
+from dashboard_data import query, require_db_url, seasons
+
+st.set_page_config(page_title="Team Trends", layout="wide")
+
+db_url = require_db_url()
+
+st.title("Team Trends")
+
+season = st.selectbox("Season", seasons(db_url))
+if season is None:
+    st.info("No rollups yet. Run the pipeline first.")
+    st.stop()
+df = query(
+    db_url,
+    """
+        SELECT team, game_date, opponent_team, pts, reb, ast
+        FROM gold.team_game_totals
+        WHERE season = :season
+        ORDER BY team, game_date;
+    """,
+    {"season": season},
+)
+
+team = st.selectbox("Team", sorted(df["team"].unique()))
+window = st.slider("Rolling window (games)", 1, 20, 5)
+
+team_df = df[df["team"] == team].set_index("game_date")
+trend = team_df[["pts", "reb", "ast"]].rolling(window, min_periods=1).mean()
+
+st.subheader(f"{team} per-game totals ({window}-game rolling mean)")
+st.line_chart(trend)
+
+st.subheader("League average points per game by date")
+st.line_chart(df.groupby("game_date")["pts"].mean())
+
+st.dataframe(team_df.reset_index(), width="stretch")
@@ -0,0 +1,36 @@
+import streamlit as st
+
+from dashboard_data import query, require_db_url, seasons
+
+st.set_page_config(page_title="Opponent Defense", layout="wide")
+
+db_url = require_db_url()
+
+st.title("Opponent Defense")
+
+season = st.selectbox("Season", seasons(db_url))
+if season is None:
+    st.info("No rollups yet. Run the pipeline first.")
+    st.stop()
+df = query(
+    db_url,
+    """
+        SELECT
+          team,
+          games,
+          pts / games         AS pts_allowed_per_game,
+          reb / games         AS reb_allowed_per_game,
+          ast / games         AS ast_allowed_per_game,
+          pts / player_rows   AS pts_allowed_per_player
+        FROM gold.opponent_season_totals
+        WHERE season = :season
+          AND games > 0
+          AND player_rows > 0
+        ORDER BY pts_allowed_per_game;
+    """,
+    {"season": season},
+)
+
+st.subheader(f"Allowed per game, {season} (best defense first)")
+st.bar_chart(df.set_index("team")[["pts_allowed_per_game"]])
+st.dataframe(df.round(1), width="stretch")
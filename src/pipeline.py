@@ -1,17 +1,221 @@
-import subprocess
+import argparse
+import importlib
+import os
 import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from feature_store import dataset_path
+from step_cache import StepCache, local_sources
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# A pipeline step: `module.main()` is called in-process once every step in
+# `deps` has finished. With pass_inputs, the upstream return values (usually
+# DataFrames) are passed positionally in `deps` order.
+#
+# Cacheable steps are skipped when the fingerprint of their sources, `inputs`
+# artifacts, `env` values and `extra()` matches the manifest and all `outputs`
+# exist; dependents then get `module.load_cached()` instead.
+Step = namedtuple(
+    "Step",
+    ["name", "module", "deps", "branch", "pass_inputs", "cacheable", "inputs", "outputs", "env", "extra"],
+    defaults=(False, (), (), (), None),
+)
+
+
+def open_seasons():
+    # Closed seasons never change; seasons in progress are refetched once a day
+    from api_cache import season_is_closed
+    from ingest import SEASONS
+
+    still_open = [s for s in SEASONS if not season_is_closed(s)]
+    return {"open": still_open, "date": date.today().isoformat() if still_open else None}
+
+
+NBA_DB = ROOT / "nba.db"
+# Same naming as train_model.model_path / params_path (not imported: it would load sklearn)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "hgb")
+MODEL_PATH = ROOT / "models" / f"{MODEL_BACKEND}_pts_predictor.pkl"
+TUNED_PARAMS_PATH = ROOT / "models" / f"{MODEL_BACKEND}_params.json"
 
 STEPS = [
-    [sys.executable, "src/ingest.py"],
-    [sys.executable, "src/features.py"],
-    [sys.executable, "src/train_model.py"],
-    [sys.executable, "src/detect_anomalies.py"],
+    # Local ML path (SQLite + feature store)
+    Step("ingest", "ingest", [], "local", False,
+         cacheable=True, outputs=[NBA_DB], env=["NBA_API_OFFLINE"], extra=open_seasons),
+    Step("features", "features", ["ingest"], "local", True,
+         cacheable=True, inputs=[NBA_DB], outputs=[dataset_path("features")], env=["OPPONENT_RANKS"]),
+    Step("train_model", "train_model", ["features"], "local", True,
+         cacheable=True, inputs=[dataset_path("features"), TUNED_PARAMS_PATH],
+         outputs=[MODEL_PATH, dataset_path("test_with_preds")], env=["MODEL_BACKEND", "USE_TUNED_PARAMS"]),
+    Step("detect_anomalies", "detect_anomalies", ["train_model"], "local", True,
+         cacheable=True, inputs=[dataset_path("test_with_preds")],
+         outputs=[dataset_path("anomalies")]),
+
+    # Medallion path (Postgres warehouse)
+    Step("ingest_bronze", "ingest_bronze", [], "medallion", False),
+    Step("run_silver", "run_silver", ["ingest_bronze"], "medallion", False),
+    Step("run_gold", "run_gold", ["run_silver"], "medallion", False),
+    Step("check_quality", "check_quality", ["run_gold"], "medallion", False),
 ]
 
-if __name__ == "__main__":
-    for cmd in STEPS:
-        print("\nRunning:", " ".join(cmd))
-        r = subprocess.run(cmd)
-        if r.returncode != 0:
-            sys.exit(r.returncode)
+MAX_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+
+def select_steps(branches):
+    steps = [s for s in STEPS if s.branch in branches]
+    names = {s.name for s in steps}
+    for s in steps:
+        missing = [d for d in s.deps if d not in names]
+        if missing:
+            raise ValueError(f"Step {s.name} depends on unselected steps: {missing}")
+    return steps
+
+
+class Cached:
+    """Placeholder for a skipped step's output, loaded only if a dependent runs."""
+
+    def __init__(self, step):
+        self.step = step
+
+    def load(self):
+        return importlib.import_module(self.step.module).load_cached()
+
+
+def run_step(step, inputs, cache=None, force=False):
+    """Returns (result, runtime, error, skipped)."""
+    t0 = time.time()
+    try:
+        fingerprint = None
+        if cache is not None and step.cacheable:
+            fingerprint = cache.fingerprint(
+                step.name,
+                local_sources(step.module),
+                step.inputs,
+                step.env,
+                extra=step.extra() if step.extra else None,
+            )
+            if not force and cache.is_fresh(step.name, fingerprint, step.outputs):
+                return Cached(step), time.time() - t0, None, True
+
+        fn = importlib.import_module(step.module).main
+        inputs = [x.load() if isinstance(x, Cached) else x for x in inputs]
+        result = fn(*inputs) if step.pass_inputs else fn()
+
+        if fingerprint is not None:
+            cache.record(step.name, fingerprint)
+        return result, time.time() - t0, None, False
+    except BaseException as e:  # check_quality signals failure with SystemExit
+        return None, time.time() - t0, e, False
+
+
+def log_timing(engine, step, runtime, error, skipped=False):
+    if engine is None:
+        return
+    from obs import start_run, log_run
+
+    run_id, _ = start_run()
+    status = "failure" if error else ("skipped" if skipped else "success")
+    try:
+        log_run(engine, run_id, layer=f"pipeline.{step.name}", status=status, runtime=runtime, error=error)
+    except Exception as e:
+        print(f"Could not record timing for {step.name}: {e}")
+
+
+def run_dag(steps, max_workers: int = MAX_WORKERS, engine=None, cache=None, force=False):
+    """
+    Runs steps as soon as their dependencies succeed, independent branches
+    concurrently. A failed step skips its dependents; other branches finish.
+    With a StepCache, steps whose fingerprint is unchanged are not re-run
+    (unless force). Returns (results by step name, failed step names).
+    """
+    results = {}
+    failed = set()
+    skipped = set()
+    remaining = {s.name: s for s in steps}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while remaining or running:
+            for name, step in list(remaining.items()):
+                if any(d in failed or d in skipped for d in step.deps):
+                    print(f"Skipping {name}: upstream step failed")
+                    skipped.add(name)
+                    del remaining[name]
+                elif all(d in results for d in step.deps):
+                    print(f"\nRunning: {name}")
+                    inputs = [results[d] for d in step.deps]
+                    running[pool.submit(run_step, step, inputs, cache, force)] = step
+                    del remaining[name]
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                result, runtime, error, was_skipped = future.result()
+                log_timing(engine, step, runtime, error, skipped=was_skipped)
+                if error is not None:
+                    print(f"Step {step.name} failed after {runtime:.1f}s: {error!r}")
+                    failed.add(step.name)
+                elif was_skipped:
+                    print(f"Step {step.name} unchanged, reusing cached artifacts")
+                    results[step.name] = result
+                else:
+                    print(f"Step {step.name} finished in {runtime:.1f}s")
+                    results[step.name] = result
+
+    return results, failed | skipped
+
+
+def main(argv=None):
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run the NBA pipeline as a DAG of in-process steps")
+    parser.add_argument(
+        "--branches",
+        default=None,
+        help="Comma-separated branches to run (local, medallion). "
+             "Default: local, plus medallion when DATABASE_URL is set.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-run every step even if its inputs are unchanged",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither skip steps nor update the step manifest",
+    )
+    args = parser.parse_args(argv)
+
+    db_url = os.getenv("DATABASE_URL")
+    if args.branches:
+        branches = args.branches.split(",")
+    else:
+        branches = ["local", "medallion"] if db_url else ["local"]
+
+    engine = None
+    if db_url:
+        from sqlalchemy import create_engine
+        engine = create_engine(db_url)
+
+    print(f"Pipeline branches: {branches}")
+    cache = None if args.no_cache else StepCache()
+    _, failed = run_dag(select_steps(branches), engine=engine, cache=cache, force=args.force)
+
+    if failed:
+        print(f"\nPipeline failed: {sorted(failed)}")
+        sys.exit(1)
     print("\nPipeline complete")
+
+
+if __name__ == "__main__":
+    main()
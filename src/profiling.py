@@ -0,0 +1,287 @@
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+PROFILES_SQL = Path(__file__).resolve().parents[1] / "sql" / "04_quality_profiles.sql"
+
+# ===============================
+# Configuration (env-driven)
+# ===============================
+
+# Rows read per table, whatever its size (TABLESAMPLE percentage is derived from it)
+PROFILE_SAMPLE_ROWS = int(os.getenv("PROFILE_SAMPLE_ROWS", "50000"))
+# SYSTEM samples whole pages (fast, bounded I/O); BERNOULLI samples rows but reads every page
+PROFILE_SAMPLE_METHOD = os.getenv("PROFILE_SAMPLE_METHOD", "SYSTEM")
+PROFILE_CHUNK_ROWS = 10_000
+RESERVOIR_SIZE = int(os.getenv("PROFILE_RESERVOIR_SIZE", "4096"))
+
+# Shift thresholds against the previous run's profile
+NULL_RATE_SHIFT = float(os.getenv("PROFILE_NULL_RATE_SHIFT", "0.05"))
+MEDIAN_SHIFT_IQR = float(os.getenv("PROFILE_MEDIAN_SHIFT_IQR", "0.5"))
+DISTINCT_SHIFT = float(os.getenv("PROFILE_DISTINCT_SHIFT", "0.3"))
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+PROFILE_COLUMNS = {
+    "silver.player_game_logs": {
+        "numeric": ["minutes", "pts", "reb", "ast", "fgm", "fga", "fg3m", "fg3a", "ftm", "fta", "tov"],
+        "categorical": ["season", "game_id", "game_date", "player_id", "team", "opponent_team"],
+    },
+}
+
+
+class HyperLogLog:
+    """
+    Distinct-count sketch over 64-bit hashes: 2^p registers, about
+    1.04 / sqrt(2^p) relative error (1.6% for p=12).
+    """
+
+    def __init__(self, p: int = 12):
+        # The rank bits (64 - p) must fit a float64 mantissa for np.frexp below
+        if not 11 <= p <= 16:
+            raise ValueError("p must be between 11 and 16")
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, values: pd.Series):
+        values = values.dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        bits = 64 - self.p
+        idx = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # frexp's exponent is the bit length (0 for 0), so rank = leading zeros + 1
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction (linear counting)
+            estimate = m * math.log(m / zeros)
+        return float(estimate)
+
+
+class Reservoir:
+    """
+    Uniform sample of at most `size` values for approximate quantiles: every
+    value gets a random priority and the `size` smallest priorities are kept.
+    """
+
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = 0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.values = np.empty(0)
+        self.priorities = np.empty(0)
+
+    def add(self, values: np.ndarray):
+        values = values[~np.isnan(values)]
+        self.values = np.concatenate([self.values, values])
+        self.priorities = np.concatenate([self.priorities, self.rng.random(len(values))])
+        if len(self.values) > self.size:
+            keep = np.argpartition(self.priorities, self.size)[: self.size]
+            self.values = self.values[keep]
+            self.priorities = self.priorities[keep]
+
+    def quantiles(self, qs) -> list:
+        if len(self.values) == 0:
+            return [math.nan] * len(qs)
+        return list(np.quantile(self.values, qs))
+
+
+class ColumnProfile:
+    """Streaming profile of one column: null rate, min/max, distinct count, mean and quantiles."""
+
+    def __init__(self, numeric: bool):
+        self.numeric = numeric
+        self.rows = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.total = 0.0
+        self.hll = HyperLogLog()
+        self.reservoir = Reservoir() if numeric else None
+
+    def add(self, values: pd.Series):
+        self.rows += len(values)
+        self.nulls += int(values.isna().sum())
+        present = values.dropna()
+        if present.empty:
+            return
+        lo, hi = present.min(), present.max()
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        self.hll.add(present)
+        if self.numeric:
+            arr = present.to_numpy(dtype=np.float64)
+            self.total += float(arr.sum())
+            self.reservoir.add(arr)
+
+    def summary(self) -> dict:
+        present = self.rows - self.nulls
+        out = {
+            "sample_rows": self.rows,
+            "null_rate": self.nulls / self.rows if self.rows else math.nan,
+            "distinct_estimate": self.hll.estimate(),
+            "min_value": None if self.min is None else str(self.min),
+            "max_value": None if self.max is None else str(self.max),
+            "mean": self.total / present if self.numeric and present else None,
+        }
+        quantiles = self.reservoir.quantiles(QUANTILES) if self.numeric else [None] * len(QUANTILES)
+        for q, v in zip(QUANTILES, quantiles):
+            out[f"p{round(q * 100):02d}"] = None if v is None or math.isnan(v) else float(v)
+        return out
+
+
+# Planner row estimate; a partitioned table (bronze) has none of its own, so
+# its partitions' estimates are summed
+ROW_ESTIMATE_SQL = """
+    SELECT CASE WHEN c.relkind = 'p' THEN (
+      SELECT sum(greatest(k.reltuples, 0))
+      FROM pg_inherits i
+      JOIN pg_class k ON k.oid = i.inhrelid
+      WHERE i.inhparent = c.oid
+    ) ELSE c.reltuples END
+    FROM pg_class c
+    WHERE c.oid = to_regclass(:t);
+"""
+
+
+def sample_percent(conn, table: str, sample_rows: int = PROFILE_SAMPLE_ROWS) -> float:
+    """TABLESAMPLE percentage that reads about sample_rows rows of `table`."""
+    estimate = conn.execute(text(ROW_ESTIMATE_SQL), {"t": table}).scalar()
+    if estimate is None or estimate <= 0:
+        # Never analyzed (or empty): ANALYZE reads a bounded sample itself
+        conn.execute(text(f"ANALYZE {table};"))
+        conn.commit()
+        estimate = conn.execute(text(ROW_ESTIMATE_SQL), {"t": table}).scalar()
+    if not estimate or estimate <= sample_rows:
+        return 100.0
+    return max(100.0 * sample_rows / float(estimate), 0.001)
+
+
+def tablesample(pct: float) -> str:
+    """FROM-clause suffix for a sample of pct percent ("" for the whole table)."""
+    return "" if pct >= 100 else f"TABLESAMPLE {PROFILE_SAMPLE_METHOD} ({pct:.4f})"
+
+
+def profile_table(engine, table: str, sample_rows: int = PROFILE_SAMPLE_ROWS) -> dict:
+    """Streams a TABLESAMPLE of `table` through a ColumnProfile per column."""
+    spec = PROFILE_COLUMNS[table]
+    profiles = {c: ColumnProfile(numeric=True) for c in spec["numeric"]}
+    profiles.update({c: ColumnProfile(numeric=False) for c in spec["categorical"]})
+
+    with engine.connect() as conn:
+        pct = sample_percent(conn, table, sample_rows)
+        sql = f"SELECT {', '.join(profiles)} FROM {table} {tablesample(pct)};"
+        streaming = conn.execution_options(stream_results=True, max_row_buffer=PROFILE_CHUNK_ROWS)
+        for chunk in pd.read_sql(text(sql), streaming, chunksize=PROFILE_CHUNK_ROWS):
+            for col, profile in profiles.items():
+                profile.add(chunk[col])
+
+    return {col: profile.summary() for col, profile in profiles.items()}
+
+
+def shift_flags(previous: dict, current: dict) -> list:
+    """Distribution changes of one column against its previous profile."""
+    if not previous:
+        return []
+    flags = []
+    if previous["null_rate"] is not None and abs(current["null_rate"] - previous["null_rate"]) > NULL_RATE_SHIFT:
+        flags.append(f"null_rate {previous['null_rate']:.3f} -> {current['null_rate']:.3f}")
+
+    prev_distinct = previous["distinct_estimate"]
+    if prev_distinct and abs(current["distinct_estimate"] / prev_distinct - 1) > DISTINCT_SHIFT:
+        flags.append(f"distinct {prev_distinct:.0f} -> {current['distinct_estimate']:.0f}")
+
+    if previous["p50"] is not None and current["p50"] is not None:
+        iqr = (previous["p75"] or 0) - (previous["p25"] or 0)
+        moved = abs(current["p50"] - previous["p50"])
+        if (iqr > 0 and moved > MEDIAN_SHIFT_IQR * iqr) or (iqr == 0 and moved > 0):
+            flags.append(f"median {previous['p50']:g} -> {current['p50']:g}")
+    return flags
+
+
+def previous_profiles(conn, table: str) -> dict:
+    rows = conn.execute(text("""
+        SELECT *
+        FROM gold.quality_profiles
+        WHERE table_name = :t
+          AND run_id = (
+            SELECT run_id FROM gold.quality_profiles
+            WHERE table_name = :t
+            ORDER BY profiled_at DESC
+            LIMIT 1
+          );
+    """), {"t": table}).mappings().all()
+    return {row["column_name"]: dict(row) for row in rows}
+
+
+def store_profiles(conn, run_id: str, table: str, profiles: dict):
+    conn.execute(text("""
+        INSERT INTO gold.quality_profiles (
+          run_id, table_name, column_name, sample_rows, null_rate, distinct_estimate,
+          min_value, max_value, mean, p05, p25, p50, p75, p95, shift_flags
+        )
+        VALUES (
+          :run_id, :table_name, :column_name, :sample_rows, :null_rate, :distinct_estimate,
+          :min_value, :max_value, :mean, :p05, :p25, :p50, :p75, :p95, :shift_flags
+        );
+    """), [
+        {"run_id": run_id, "table_name": table, "column_name": col, **summary}
+        for col, summary in profiles.items()
+    ])
+
+
+def run_profiles(engine, run_id: str, tables=None) -> dict:
+    """
+    Profiles each table, flags shifts against its previous profile and stores
+    the result in gold.quality_profiles. Returns {table: {column: flags}}.
+    """
+    with engine.begin() as conn:
+        conn.execute(text(PROFILES_SQL.read_text(encoding="utf-8")))
+
+    flagged = {}
+    for table in tables or PROFILE_COLUMNS:
+        t0 = time.time()
+        profiles = profile_table(engine, table)
+        with engine.begin() as conn:
+            previous = previous_profiles(conn, table)
+            for col, summary in profiles.items():
+                summary["shift_flags"] = shift_flags(previous.get(col), summary)
+            store_profiles(conn, run_id, table, profiles)
+
+        sample_rows = next(iter(profiles.values()))["sample_rows"]
+        print(f"Profiled {table}: {sample_rows} sampled rows in {time.time() - t0:.2f}s")
+        flagged[table] = {col: s["shift_flags"] for col, s in profiles.items() if s["shift_flags"]}
+    return flagged
+
+
+if __name__ == "__main__":
+    # Sketch accuracy on synthetic data (no database needed)
+    from synthetic import make_game_logs
+
+    df = make_game_logs(seasons=["2023-24", "2024-25"])
+    for col, numeric in [("PLAYER_ID", False), ("GAME_ID", False), ("PTS", True)]:
+        profile = ColumnProfile(numeric=numeric)
+        t0 = time.perf_counter()
+        for start in range(0, len(df), PROFILE_CHUNK_ROWS):
+            profile.add(df[col].iloc[start:start + PROFILE_CHUNK_ROWS])
+        summary = profile.summary()
+        exact = df[col].nunique()
+        print(
+            f"{col}: distinct ~{summary['distinct_estimate']:.0f} (exact {exact}), "
+            f"p50 {summary['p50']} ({time.perf_counter() - t0:.3f}s)"
+        )
+    print(f"PTS exact p50 {df['PTS'].median()}, p95 {df['PTS'].quantile(0.95)} vs ~{summary['p95']}")
@@ -5,23 +5,154 @@ from pathlib import Path
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 
+from feature_specs import GOLD_FEATURES, render_gold_sql
 from obs import start_run, log_run
-
-
-def table_exists(conn, schema: str, table: str) -> bool:
-    return bool(
-        conn.execute(
-            text("""
-                SELECT EXISTS (
-                    SELECT 1
-                    FROM information_schema.tables
-                    WHERE table_schema = :schema
-                      AND table_name = :table
-                );
-            """),
-            {"schema": schema, "table": table},
-        ).scalar()
+from watermarks import ensure_watermarks, get_watermark, set_watermark, reset_watermark
+
+# Rebuild gold.player_features from scratch (e.g. after changing the feature SQL)
+GOLD_FULL_REFRESH = os.getenv("GOLD_FULL_REFRESH", "0") == "1"
+
+FEATURES_WATERMARK = "gold.player_features"
+
+# Small per-group tables (dimension + dashboard rollups), each recomputed from
+# silver for the groups touched by the delta: table -> merge SQL in sql/
+ROLLUPS = {
+    "gold.dim_players": "gold_dim_players_merge.sql",
+    "gold.team_game_totals": "gold_team_game_totals_merge.sql",
+    "gold.player_season_totals": "gold_player_season_totals_merge.sql",
+}
+
+# One-off seed of the opponent running totals from gold.player_features (which is
+# in sync with the watermark) when the table is new or was truncated separately
+SEED_OPPONENT_TOTALS_SQL = """
+    INSERT INTO gold.opponent_season_totals (
+      season, team, games, player_rows, pts, reb, ast, refreshed_at
     )
+    SELECT
+      season,
+      opponent_team,
+      count(DISTINCT game_id),
+      count(*),
+      coalesce(sum(pts), 0),
+      coalesce(sum(reb), 0),
+      coalesce(sum(ast), 0),
+      now()
+    FROM gold.player_features
+    WHERE opponent_team IS NOT NULL
+    GROUP BY season, opponent_team;
+"""
+
+# Season-level ranks move whenever a season gets new games, so re-sync them for the
+# touched seasons. Only rows whose rank actually changed are rewritten.
+REFRESH_RANKS_SQL = """
+    UPDATE gold.player_features f
+    SET
+      opp_pts_allowed_rank = r.opp_pts_allowed_rank,
+      opp_reb_allowed_rank = r.opp_reb_allowed_rank,
+      opp_ast_allowed_rank = r.opp_ast_allowed_rank,
+      refreshed_at = now()
+    FROM gold.opponent_ranks r
+    WHERE r.season = ANY(:seasons)
+      AND f.season = r.season
+      AND f.opponent_team = r.team
+      AND (
+        f.opp_pts_allowed_rank IS DISTINCT FROM r.opp_pts_allowed_rank
+        OR f.opp_reb_allowed_rank IS DISTINCT FROM r.opp_reb_allowed_rank
+        OR f.opp_ast_allowed_rank IS DISTINCT FROM r.opp_ast_allowed_rank
+      );
+"""
+
+
+def read_sql(path: Path) -> str:
+    sql = path.read_text(encoding="utf-8").strip()
+    if not sql:
+        raise ValueError(f"SQL file is empty: {path}")
+    return sql
+
+
+def delta_bounds(conn):
+    """
+    The (low, high] INGESTED_AT window of silver rows not yet reflected in gold,
+    as query params, or None when gold is up to date.
+    """
+    if GOLD_FULL_REFRESH:
+        tables = ["gold.player_features", "gold.opponent_season_totals", *ROLLUPS]
+        print(f"GOLD_FULL_REFRESH: rebuilding {', '.join(tables)}")
+        conn.execute(text(f"TRUNCATE {', '.join(tables)};"))
+        reset_watermark(conn, FEATURES_WATERMARK)
+
+    low = get_watermark(conn, FEATURES_WATERMARK)
+    # Only advance as far as silver has been merged
+    high = conn.execute(
+        text("SELECT max(ingested_at) FROM silver.player_game_logs;")
+    ).scalar()
+
+    if high is None or (low is not None and high <= low):
+        print(f"Gold is up to date (watermark={low})")
+        return None
+
+    params = {"low": low if low is not None else "-infinity", "high": high}
+    print(f"Refreshing gold for INGESTED_AT in ({params['low']}, {high}]")
+    return params
+
+
+def is_empty(conn, table: str) -> bool:
+    return conn.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {table});")).scalar()
+
+
+def seed_opponent_totals(conn) -> int:
+    """Seeds an empty gold.opponent_season_totals from gold.player_features."""
+    if not is_empty(conn, "gold.opponent_season_totals"):
+        return 0
+    seeded = conn.execute(text(SEED_OPPONENT_TOTALS_SQL)).rowcount
+    if seeded:
+        print(f"Seeded gold.opponent_season_totals from gold.player_features ({seeded} teams)")
+    return seeded
+
+
+def update_opponent_totals(conn, merge_sql: str, params: dict) -> int:
+    """
+    Applies the delta window to gold.opponent_season_totals. Must run before
+    refresh_player_features (see sql/gold_opponent_season_totals_merge.sql).
+    """
+    seed_opponent_totals(conn)
+    return conn.execute(text(merge_sql), params).rowcount
+
+
+def refresh_player_features(conn, merge_sql: str, params: dict):
+    """
+    Upserts the rows of gold.player_features affected by silver rows in the
+    delta window. Returns (feature rows written, rank rows updated).
+    """
+    seasons = conn.execute(text("""
+        SELECT DISTINCT season
+        FROM silver.player_game_logs
+        WHERE ingested_at > :low AND ingested_at <= :high;
+    """), params).scalars().all()
+
+    features_rows = conn.execute(text(merge_sql), params).rowcount
+    ranks_rows = conn.execute(text(REFRESH_RANKS_SQL), {"seasons": list(seasons)}).rowcount
+
+    return features_rows, ranks_rows
+
+
+def refresh_rollup(conn, table: str, merge_sql: str, params: dict) -> int:
+    """Upserts the groups of a ROLLUPS table touched by the delta window."""
+    if is_empty(conn, table):
+        # First run since the table was added: backfill every group
+        params = {**params, "low": "-infinity"}
+    return conn.execute(text(merge_sql), params).rowcount
+
+
+def backfill_rollup(conn, table: str, merge_sql: str) -> int:
+    """
+    Fills an empty ROLLUPS table up to the gold watermark when there is no
+    delta (e.g. the table was added after gold last caught up with silver).
+    """
+    high = get_watermark(conn, FEATURES_WATERMARK)
+    if high is None or not is_empty(conn, table):
+        return 0
+    return conn.execute(text(merge_sql), {"low": "-infinity", "high": high}).rowcount
 
 
 def main():
@@ -31,38 +162,51 @@ def main():
     run_id, t0 = start_run()
 
     root = Path(__file__).resolve().parents[1]
-    sql_path = root / "sql" / "gold_models.sql"
+    models_path = root / "sql" / "gold_models.sql"
+    merge_path = root / "sql" / "gold_player_features_merge.sql"
+    opponent_path = root / "sql" / "gold_opponent_season_totals_merge.sql"
 
     try:
-        sql = sql_path.read_text(encoding="utf-8").strip()
-        if not sql:
-            raise ValueError(f"SQL file is empty: {sql_path}")
+        models_sql = read_sql(models_path)
+        fragments = render_gold_sql(GOLD_FEATURES)
+        merge_sql = read_sql(merge_path).format(**fragments)
+        opponent_sql = read_sql(opponent_path)
+        rollup_sqls = {table: read_sql(root / "sql" / name) for table, name in ROLLUPS.items()}
 
         with engine.begin() as conn:
-            conn.execute(text(sql))
-
-            opponents_rows = 0
-            features_rows = 0
-
-            if table_exists(conn, "gold", "opponents_ranks"):
-                opponents_rows = conn.execute(
-                    text("SELECT COUNT(*) FROM gold.opponents_ranks;")
-                ).scalar()
-
-            if table_exists(conn, "gold", "player_features"):
-                features_rows = conn.execute(
-                    text("SELECT COUNT(*) FROM gold.player_features;")
-                ).scalar()
-
-        total_rows = (opponents_rows or 0) + (features_rows or 0)
+            conn.execute(text(models_sql))
+            for stmt in fragments["add_columns"]:
+                conn.execute(text(stmt))
+            ensure_watermarks(conn)
+
+            features_rows = ranks_rows = opponent_rows = 0
+            rollup_rows = {}
+            params = delta_bounds(conn)
+            if params is not None:
+                opponent_rows = update_opponent_totals(conn, opponent_sql, params)
+                features_rows, ranks_rows = refresh_player_features(conn, merge_sql, params)
+                for table, sql in rollup_sqls.items():
+                    rollup_rows[table] = refresh_rollup(conn, table, sql, params)
+                set_watermark(conn, FEATURES_WATERMARK, params["high"])
+            else:
+                # The dashboard and its pages read only these tables (and the
+                # opponent ranks built on gold.opponent_season_totals)
+                opponent_rows = seed_opponent_totals(conn)
+                for table, sql in rollup_sqls.items():
+                    rollup_rows[table] = backfill_rollup(conn, table, sql)
+
+        total_rows = features_rows + ranks_rows + opponent_rows + sum(rollup_rows.values())
         runtime = time.time() - t0
 
         log_run(engine, run_id, layer="gold", status="success", runtime=runtime, rows=total_rows)
 
         print(
             f"Gold layer created/updated successfully "
-            f"(opponents_ranks={opponents_rows}, player_features={features_rows})"
+            f"(player_features upserted={features_rows}, ranks updated={ranks_rows}, "
+            f"opponent totals updated={opponent_rows})"
         )
+        for table, rows in rollup_rows.items():
+            print(f"  {table}: {rows} groups upserted")
 
     except Exception as e:
         runtime = time.time() - t0
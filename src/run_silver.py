@@ -4,8 +4,50 @@ from pathlib import Path
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from obs import start_run, log_run
+from watermarks import ensure_watermarks, get_watermark, set_watermark, reset_watermark
 import time
 
+# Rebuild silver.player_game_logs from all of bronze
+SILVER_FULL_REFRESH = os.getenv("SILVER_FULL_REFRESH", "0") == "1"
+
+SILVER_WATERMARK = "silver.player_game_logs"
+
+
+def read_sql(path: Path) -> str:
+    sql = path.read_text(encoding="utf-8").strip()
+    if not sql:
+        raise ValueError(f"SQL file is empty: {path}")
+    return sql
+
+
+def merge_silver(conn, merge_sql: str) -> int:
+    """
+    Merges bronze rows ingested since the last silver run into the typed
+    silver table. Returns the number of rows inserted or updated.
+    """
+    if SILVER_FULL_REFRESH:
+        print("SILVER_FULL_REFRESH: rebuilding silver.player_game_logs")
+        conn.execute(text("TRUNCATE silver.player_game_logs;"))
+        reset_watermark(conn, SILVER_WATERMARK)
+
+    low = get_watermark(conn, SILVER_WATERMARK)
+    high = conn.execute(
+        text('SELECT max("INGESTED_AT") FROM bronze.player_game_logs;')
+    ).scalar()
+
+    if high is None or (low is not None and high <= low):
+        print(f"silver.player_game_logs is up to date (watermark={low})")
+        return 0
+
+    params = {"low": low if low is not None else "-infinity", "high": high}
+    print(f"Merging bronze rows with INGESTED_AT in ({params['low']}, {high}]")
+
+    rows = conn.execute(text(merge_sql), params).rowcount
+    set_watermark(conn, SILVER_WATERMARK, high)
+
+    return rows
+
+
 def main():
     load_dotenv()
     engine = create_engine(os.environ["DATABASE_URL"])
@@ -14,22 +56,22 @@ def main():
 
     root = Path(__file__).resolve().parents[1]
     sql_path = root / "sql" / "silver_player_game_logs.sql"
+    merge_path = root / "sql" / "silver_player_game_logs_merge.sql"
 
     try:
-        sql = sql_path.read_text(encoding="utf-8").strip()
-        if not sql:
-            raise ValueError(f"SQL file is empty: {sql_path}")
+        sql = read_sql(sql_path)
+        merge_sql = read_sql(merge_path)
 
         with engine.begin() as conn:
             conn.execute(text(sql))
+            ensure_watermarks(conn)
 
-            # Row count for observability (within the same transaction)
-            rows = conn.execute(text("SELECT COUNT(*) FROM silver.player_game_logs;")).scalar()
+            rows = merge_silver(conn, merge_sql)
 
         runtime = time.time() - t0
         log_run(engine, run_id, layer="silver", status="success", runtime=runtime, rows=rows)
 
-        print(f"Silver layer created/updated successfully: silver.player_game_logs (rows={rows})")
+        print(f"Silver layer created/updated successfully: silver.player_game_logs (rows merged={rows})")
 
     except Exception as e:
         runtime = time.time() - t0
@@ -0,0 +1,110 @@
+import ast
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+MANIFEST_PATH = Path(os.getenv("PIPELINE_MANIFEST", str(ROOT / "data" / ".pipeline_manifest.json")))
+
+
+def local_sources(module: str) -> list:
+    """
+    The step's module file plus every src/ module it imports, transitively,
+    so editing a shared helper (e.g. feature_specs.py) invalidates the step.
+    """
+    seen = set()
+    todo = [module]
+    while todo:
+        name = todo.pop()
+        path = SRC / f"{name}.py"
+        if name in seen or not path.exists():
+            continue
+        seen.add(name)
+        tree = ast.parse(path.read_text(encoding="utf-8"))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                todo.extend(a.name.split(".")[0] for a in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                todo.append(node.module.split(".")[0])
+    return sorted(SRC / f"{name}.py" for name in seen)
+
+
+class StepCache:
+    """
+    Content-hash fingerprints of each step's inputs (source files, upstream
+    artifacts, env config), stored in a JSON manifest next to the data.
+    File hashes are memoized by (size, mtime) so unchanged files are not re-read.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.manifest = json.loads(self.path.read_text(encoding="utf-8"))
+        else:
+            self.manifest = {}
+        self.manifest.setdefault("steps", {})
+        self.manifest.setdefault("files", {})
+
+    def _file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path)
+        with self._lock:
+            cached = self.manifest["files"].get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self.manifest["files"][key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def _path_hash(self, path: Path) -> str:
+        if not path.exists():
+            return "missing"
+        if path.is_file():
+            return self._file_hash(path)
+        h = hashlib.sha256()
+        for p in sorted(path.rglob("*")):
+            if p.is_file():
+                h.update(str(p.relative_to(path)).encode("utf-8"))
+                h.update(self._file_hash(p).encode("utf-8"))
+        return h.hexdigest()
+
+    def fingerprint(self, name: str, sources, inputs, env_keys, extra=None) -> str:
+        payload = {
+            "step": name,
+            "sources": {str(p.relative_to(ROOT)): self._path_hash(p) for p in sources},
+            "inputs": {str(p): self._path_hash(Path(p)) for p in inputs},
+            "env": {k: os.getenv(k) for k in sorted(env_keys)},
+            "extra": extra,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def is_fresh(self, name: str, fingerprint: str, outputs) -> bool:
+        with self._lock:
+            entry = self.manifest["steps"].get(name)
+        return (
+            entry is not None
+            and entry["fingerprint"] == fingerprint
+            and all(Path(p).exists() for p in outputs)
+        )
+
+    def record(self, name: str, fingerprint: str):
+        with self._lock:
+            self.manifest["steps"][name] = {
+                "fingerprint": fingerprint,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.manifest, indent=2, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.path)
@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+TEAMS = [
+    "ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DAL", "DEN", "DET", "GSW",
+    "HOU", "IND", "LAC", "LAL", "MEM", "MIA", "MIL", "MIN", "NOP", "NYK",
+    "OKC", "ORL", "PHI", "PHX", "POR", "SAC", "SAS", "TOR", "UTA", "WAS",
+]
+
+
+def make_game_logs(
+    seasons=("2023-24", "2024-25"),
+    players_per_team: int = 13,
+    games_per_season: int = 82,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Builds a bronze-shaped LeagueGameLog player frame with random box scores.
+    Used by the benchmarks so they run without stats.nba.com.
+    """
+    rng = np.random.default_rng(seed)
+    n_players = len(TEAMS) * players_per_team
+    player_ids = np.arange(1_000, 1_000 + n_players)
+    player_team = np.repeat(np.arange(len(TEAMS)), players_per_team)
+
+    frames = []
+    for s_idx, season in enumerate(seasons):
+        start_year = int(season[:4])
+        first_day = date(start_year, 10, 22)
+
+        # Each team plays one game every other day against a random opponent
+        game_idx = np.arange(games_per_season)
+        game_dates = [(first_day + timedelta(days=2 * int(g))).isoformat() for g in game_idx]
+        opponents = (np.arange(len(TEAMS))[:, None] + 1 + rng.integers(0, len(TEAMS) - 1, (len(TEAMS), games_per_season))) % len(TEAMS)
+        home = rng.random((len(TEAMS), games_per_season)) < 0.5
+
+        rows_team = np.repeat(player_team, games_per_season)
+        rows_game = np.tile(game_idx, n_players)
+        n = len(rows_team)
+
+        minutes = np.clip(rng.normal(24, 9, n), 0, 48).round()
+        pts = rng.poisson(np.maximum(minutes, 1) * 0.45)
+        reb = rng.poisson(np.maximum(minutes, 1) * 0.18)
+        ast = rng.poisson(np.maximum(minutes, 1) * 0.11)
+        fga = pts // 2 + rng.poisson(3, n)
+        fgm = np.minimum(fga, pts // 2)
+        fg3a = rng.poisson(3, n)
+        fg3m = np.minimum(fg3a, rng.poisson(1, n))
+        fta = rng.poisson(2, n)
+        ftm = np.minimum(fta, rng.poisson(1.5, n))
+
+        team_abbr = np.array(TEAMS)[rows_team]
+        opp_abbr = np.array(TEAMS)[opponents[rows_team, rows_game]]
+        sep = np.where(home[rows_team, rows_game], " vs. ", " @ ")
+
+        frames.append(pd.DataFrame({
+            "SEASON_ID": f"2{start_year}",
+            "PLAYER_ID": np.repeat(player_ids, games_per_season),
+            "PLAYER_NAME": np.char.add("Player ", np.repeat(player_ids, games_per_season).astype(str)),
+            "TEAM_ID": 1_610_612_700 + rows_team,
+            "TEAM_ABBREVIATION": team_abbr,
+            "TEAM_NAME": team_abbr,
+            "GAME_ID": [f"002{start_year % 100:02d}{s_idx:01d}{t:02d}{g:03d}" for t, g in zip(rows_team, rows_game)],
+            "GAME_DATE": np.array(game_dates)[rows_game],
+            "MATCHUP": np.char.add(np.char.add(team_abbr, sep), opp_abbr),
+            "WL": np.where(rng.random(n) < 0.5, "W", "L"),
+            "MIN": minutes,
+            "FGM": fgm,
+            "FGA": fga,
+            "FG_PCT": np.where(fga > 0, fgm / np.maximum(fga, 1), np.nan).round(3),
+            "FG3M": fg3m,
+            "FG3A": fg3a,
+            "FG3_PCT": np.where(fg3a > 0, fg3m / np.maximum(fg3a, 1), np.nan).round(3),
+            "FTM": ftm,
+            "FTA": fta,
+            "FT_PCT": np.where(fta > 0, ftm / np.maximum(fta, 1), np.nan).round(3),
+            "OREB": reb // 4,
+            "DREB": reb - reb // 4,
+            "REB": reb,
+            "AST": ast,
+            "STL": rng.poisson(0.8, n),
+            "BLK": rng.poisson(0.5, n),
+            "TOV": rng.poisson(1.4, n),
+            "PF": rng.poisson(2, n),
+            "PTS": pts,
+            "PLUS_MINUS": rng.integers(-20, 21, n),
+            "FANTASY_PTS": (pts + 1.2 * reb + 1.5 * ast).round(1),
+            "VIDEO_AVAILABLE": 1,
+            "SEASON": season,
+        }))
+
+    df = pd.concat(frames, ignore_index=True)
+    df["INGESTED_AT"] = datetime.now(timezone.utc)
+    return df
@@ -1,42 +1,123 @@
+import json
+import os
+import time
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.model_selection import train_test_split
 
-def load_features(path: str = "data/processed/features.csv") -> pd.DataFrame:
-    return pd.read_csv(path)
-
-def train_model(df: pd.DataFrame):
-    feature_cols = [
-        "PTS_LAST5",
-        "REB_LAST5",
-        "AST_LAST5",
-        "MIN_LAST5",
-        "PRA_LAST5",
-        "OPP_PTS_ALLOWED_RANK",
-        "OPP_REB_ALLOWED_RANK",
-        "OPP_PTS_ALLOWED_RANK",
-    ]
-
-    x = df[feature_cols]
-    y = df["PTS_NEXT_GAME"]
+from feature_store import read_dataset, write_dataset
+
+# "hgb" (default): histogram gradient boosting with early stopping, seconds to
+# fit and a model of a few MB. "rf": the original fully grown random forest.
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "hgb")
+BACKENDS = ["hgb", "rf"]
+# Use models/<backend>_params.json from tune_model.py when it exists
+USE_TUNED_PARAMS = os.getenv("USE_TUNED_PARAMS", "1") == "1"
+
+FEATURE_COLS = [
+    "PTS_LAST5",
+    "REB_LAST5",
+    "AST_LAST5",
+    "MIN_LAST5",
+    "PRA_LAST5",
+    "OPP_PTS_ALLOWED_RANK",
+    "OPP_REB_ALLOWED_RANK",
+    "OPP_PTS_ALLOWED_RANK",
+]
+
+# Columns carried into test_with_preds for anomaly detection / plots
+ID_COLS = [
+    "SEASON",
+    "GAME_ID",
+    "GAME_DATE",
+    "PLAYER_ID",
+    "PLAYER_NAME",
+    "TEAM_ABBREVIATION",
+    "OPPONENT_TEAM",
+    "MATCHUP",
+    "PTS",
+]
+
+# Everything training reads (and carries into test_with_preds)
+TRAIN_COLS = list(dict.fromkeys(ID_COLS + FEATURE_COLS + ["PTS_NEXT_GAME"]))
+
+def load_features(name: str = "features", seasons=None) -> pd.DataFrame:
+    # Only the columns training needs; season partitions outside `seasons` are skipped
+    filters = [("SEASON", "in", list(seasons))] if seasons else None
+    return read_dataset(name, columns=TRAIN_COLS, filters=filters)
+
+def feature_matrix(df: pd.DataFrame, feature_cols) -> np.ndarray:
+    """Contiguous float32 matrix (the trees bin / split on float32 anyway; NaN is kept)."""
+    return np.ascontiguousarray(df[feature_cols].to_numpy(dtype=np.float32))
+
+
+def make_estimator(backend: str = MODEL_BACKEND, params: dict = None):
+    """The backend's default estimator, with `params` (e.g. tuned ones) applied on top."""
+    model = _default_estimator(backend)
+    return model.set_params(**params) if params else model
+
+
+def _default_estimator(backend: str):
+    if backend == "hgb":
+        return HistGradientBoostingRegressor(
+            learning_rate=0.05,
+            max_iter=1000,
+            max_leaf_nodes=31,
+            min_samples_leaf=40,
+            l2_regularization=1.0,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=25,
+            random_state=42,
+        )
+    if backend == "rf":
+        return RandomForestRegressor(
+            n_estimators=300,
+            max_depth=None,
+            random_state=42,
+            n_jobs=-1,
+        )
+    raise ValueError(f"Unknown MODEL_BACKEND {backend!r}, expected one of {BACKENDS}")
+
+
+def model_path(root: Path, backend: str = MODEL_BACKEND) -> Path:
+    return root / "models" / f"{backend}_pts_predictor.pkl"
+
+
+def params_path(root: Path, backend: str = MODEL_BACKEND) -> Path:
+    return root / "models" / f"{backend}_params.json"
+
+
+def load_tuned_params(root: Path, backend: str = MODEL_BACKEND) -> dict:
+    path = params_path(root, backend)
+    if not USE_TUNED_PARAMS or not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["params"]
+
+
+def train_model(df: pd.DataFrame, backend: str = MODEL_BACKEND, params: dict = None):
+    feature_cols = list(FEATURE_COLS)
+
+    x = feature_matrix(df, feature_cols)
+    y = df["PTS_NEXT_GAME"].to_numpy(dtype=np.float32)
 
     x_train, x_test, y_train, y_test = train_test_split(
         x, y, test_size=0.2, shuffle=False
     )
 
-    model = RandomForestRegressor(
-        n_estimators=300,
-        max_depth=None,
-        random_state=42,
-        n_jobs=-1,
-    )
+    model = make_estimator(backend, params)
 
-    print("Model is being trained")
+    print(f"Model is being trained ({backend}{', tuned' if params else ''})")
+    t0 = time.perf_counter()
     model.fit(x_train, y_train)
+    print(f"Fit in {time.perf_counter() - t0:.2f}s")
+    if backend == "hgb":
+        print(f"Boosting iterations: {model.n_iter_} (early stopping)")
 
     print("Calculating prediction")
     y_pred = model.predict(x_test)
@@ -47,24 +128,20 @@ def train_model(df: pd.DataFrame):
     print(f"R^2: {r2:.3f}")
 
     df_test = df.iloc[len(x_train):].copy()
-    df_test["PRED_PTS_NEXT_GAME"] = y_pred
+    # float64 like before, so test_with_preds keeps its schema
+    df_test["PRED_PTS_NEXT_GAME"] = y_pred.astype(np.float64)
 
     return model, df_test, feature_cols
 
-def save_artifacts(model, df_test: pd.DataFrame, feature_cols, root: Path):
+def save_artifacts(model, df_test: pd.DataFrame, feature_cols, root: Path, backend: str = MODEL_BACKEND):
     models_dir = root / "models"
     models_dir.mkdir(exist_ok=True)
 
-    model_path = models_dir / "rf_pts_predictor.pkl"
-    joblib.dump(model, model_path)
-    print(f"Saved model to {model_path}")
+    path = model_path(root, backend)
+    joblib.dump(model, path)
+    print(f"Saved model to {path} ({path.stat().st_size / 1e6:.1f} MB)")
 
-    processed_dir = root / "data" / "processed"
-    processed_dir.mkdir(parents=True, exist_ok=True)
-
-    test_path = processed_dir / "test_with_preds.csv"
-    df_test.to_csv(test_path, index=False)
-    print("Saved test set with predictions to {test_path}")
+    write_dataset(df_test, "test_with_preds")
 
     feature_list_path = models_dir / "feature_column.txt"
     with open(feature_list_path, "w") as f:
@@ -73,12 +150,25 @@ def save_artifacts(model, df_test: pd.DataFrame, feature_cols, root: Path):
     print(f"Saved feature column list to {feature_list_path}")
 
 
-if __name__ == "__main__":
+def load_cached(name: str = "test_with_preds") -> pd.DataFrame:
+    return read_dataset(name)
+
+
+def main(df_features: pd.DataFrame = None) -> pd.DataFrame:
     root = Path(__file__).resolve().parents[1]
 
-    features_path = root / "data" / "processed" / "features.csv"
-    print(f"Loading features from {features_path}")
-    df_features = load_features(str(features_path))
+    if df_features is None:
+        print("Loading features from the feature store")
+        df_features = load_features()
+    else:
+        # The pipeline hands over the full features frame: keep what a standalone
+        # run reads from the store, in the same order, so test_with_preds matches
+        df_features = df_features[[c for c in df_features.columns if c in TRAIN_COLS]].reset_index(drop=True)
+
+    model, df_test, feature_cols = train_model(df_features, params=load_tuned_params(root))
+    save_artifacts(model, df_test, feature_cols, root)
+    return df_test
 
-    model, df_test, feature_cols = train_model(df_features)
-    save_artifacts(model, df_test, feature_cols, root)
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
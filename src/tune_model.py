@@ -0,0 +1,217 @@
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import backtest
+from train_model import MODEL_BACKEND, load_features, params_path
+
+# ===============================
+# Configuration (env-driven)
+# ===============================
+
+ROOT = Path(__file__).resolve().parents[1]
+# One JSON line per (candidate, fold) result, so an interrupted search resumes
+TUNE_STATE_DIR = Path(os.getenv("TUNE_STATE_DIR", str(ROOT / "data" / "state" / "tuning")))
+TUNE_CANDIDATES = int(os.getenv("TUNE_CANDIDATES", "27"))
+# Successive halving: keep the best 1/eta each rung, give survivors eta x the folds
+TUNE_ETA = int(os.getenv("TUNE_ETA", "3"))
+TUNE_MIN_FOLDS = int(os.getenv("TUNE_MIN_FOLDS", "2"))
+TUNE_SEED = int(os.getenv("TUNE_SEED", "42"))
+TUNE_WORKERS = int(os.getenv("TUNE_WORKERS", str(os.cpu_count() or 1)))
+
+# ("log", low, high) / ("int", low, high) / ("choice", [values])
+SEARCH_SPACES = {
+    "hgb": {
+        "learning_rate": ("log", 0.02, 0.3),
+        "max_leaf_nodes": ("int", 15, 127),
+        "min_samples_leaf": ("int", 10, 200),
+        "l2_regularization": ("log", 1e-3, 10.0),
+    },
+    "rf": {
+        "n_estimators": ("choice", [100, 200, 300]),
+        "max_depth": ("choice", [None, 8, 12, 16, 24]),
+        "min_samples_leaf": ("int", 1, 50),
+        "max_features": ("choice", [1.0, 0.5, "sqrt"]),
+    },
+}
+
+
+def sample_candidates(backend: str, n: int, seed: int) -> dict:
+    """n random parameter sets, by a stable id (the same seed gives the same candidates)."""
+    rng = np.random.default_rng(seed)
+    candidates = {}
+    for _ in range(n):
+        params = {}
+        for name, (kind, *args) in SEARCH_SPACES[backend].items():
+            if kind == "log":
+                params[name] = float(f"{math.exp(rng.uniform(math.log(args[0]), math.log(args[1]))):.4g}")
+            elif kind == "int":
+                params[name] = int(rng.integers(args[0], args[1] + 1))
+            else:
+                params[name] = args[0][int(rng.integers(len(args[0])))]
+        candidate_id = hashlib.sha1(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+        candidates[candidate_id] = params
+    return candidates
+
+
+def search_key(backend: str, matrix_path: Path, n_folds: int) -> str:
+    """
+    Identifies results that are reusable: same data, folds, space and seed.
+    Candidate ids hash their params, so TUNE_CANDIDATES can grow between runs.
+    """
+    h = hashlib.sha1()
+    # Features / labels and the label dates that decide each fold's training rows
+    for path in [matrix_path, matrix_path.with_name("label_days.npy")]:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    h.update(json.dumps({
+        "backend": backend,
+        "space": SEARCH_SPACES[backend],
+        "seed": TUNE_SEED,
+        "folds": [n_folds, backtest.BACKTEST_WINDOW_DAYS, backtest.BACKTEST_MIN_TRAIN_DAYS],
+    }, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+def load_results(path: Path) -> dict:
+    """(candidate_id, fold) -> fold result, from earlier runs of the same search."""
+    results = {}
+    if not path.exists():
+        return results
+    content = path.read_text(encoding="utf-8")
+    for line in content.splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            # Blank, or cut short by an interrupted write: that fit is simply redone
+            continue
+        results[(row["candidate"], row["fold"])] = row
+    if content and not content.endswith("\n"):
+        # Start the next append on its own line
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n")
+    return results
+
+
+def widen(chosen: set, n_folds: int, size: int) -> set:
+    """Adds evenly spaced folds until about `size` are chosen; earlier rungs' folds are kept."""
+    spread = np.linspace(0, n_folds - 1, min(size, n_folds)).round().astype(int)
+    return chosen | set(spread.tolist())
+
+
+def score(results: dict, candidate_id: str, chosen: set) -> float:
+    """MAE over the chosen folds, weighted by test rows."""
+    rows = [results[(candidate_id, f)] for f in chosen]
+    return float(np.average([r["mae"] for r in rows], weights=[r["test_rows"] for r in rows]))
+
+
+def evaluate(pool, folds, backend, threads, candidates, alive, chosen, results, log):
+    """Runs every missing (candidate, fold) pair, appending each result as it completes."""
+    futures = {
+        pool.submit(backtest.run_fold, folds[f], backend, threads, candidates[c]): (c, f)
+        for c in alive for f in sorted(chosen) if (c, f) not in results
+    }
+    for future in as_completed(futures):
+        c, f = futures[future]
+        fold = future.result()
+        row = {
+            "candidate": c, "fold": f, "params": candidates[c],
+            "mae": fold["MAE"], "test_rows": fold["TEST_ROWS"], "fit_seconds": fold["FIT_SECONDS"],
+        }
+        results[(c, f)] = row
+        log.write(json.dumps(row) + "\n")
+        log.flush()
+    return len(futures)
+
+
+def successive_halving(df: pd.DataFrame, backend: str = MODEL_BACKEND, workers: int = TUNE_WORKERS) -> dict:
+    """
+    Random candidates, pruned by successive halving over walk-forward folds:
+    every candidate is scored on a few folds, the best 1/eta move on to eta
+    times as many, until the survivors are scored on all folds.
+    """
+    df, folds = backtest.prepare(df)
+    candidates = sample_candidates(backend, TUNE_CANDIDATES, TUNE_SEED)
+    workers = max(1, workers)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    scratch = Path(tempfile.mkdtemp(prefix="tune-", dir=backtest.BACKTEST_SCRATCH_DIR))
+    try:
+        matrix_path = backtest.write_matrix(df, scratch)
+        key = search_key(backend, matrix_path, len(folds))
+        state_path = TUNE_STATE_DIR / f"{backend}-{key}.jsonl"
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        results = load_results(state_path)
+        print(
+            f"Tuning {backend}: {len(candidates)} candidates, {len(folds)} folds, {workers} workers x {threads} threads "
+            f"({len(results)} fold results reused from {state_path.name})"
+        )
+
+        # Folds and the feature matrix are built once; workers map the same file
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=backtest.open_matrix, initargs=(str(matrix_path),)
+        ) as pool, open(state_path, "a", encoding="utf-8") as log:
+            alive = list(candidates)
+            chosen = set()
+            size = TUNE_MIN_FOLDS
+            rung = 0
+            while True:
+                chosen = widen(chosen, len(folds), size)
+                t0 = time.time()
+                ran = evaluate(pool, folds, backend, threads, candidates, alive, chosen, results, log)
+                ranked = sorted(alive, key=lambda c: score(results, c, chosen))
+                print(
+                    f"Rung {rung}: {len(alive)} candidates x {len(chosen)} folds, {ran} fits in {time.time() - t0:.1f}s, "
+                    f"best MAE {score(results, ranked[0], chosen):.3f}"
+                )
+                if len(chosen) >= len(folds):
+                    break
+                alive = ranked[: max(1, len(ranked) // TUNE_ETA)]
+                size = len(chosen) * TUNE_ETA
+                rung += 1
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    leaderboard = [
+        {"candidate": c, "mae": score(results, c, chosen), "params": candidates[c]} for c in ranked
+    ]
+    return {
+        "backend": backend,
+        "search_key": key,
+        "params": candidates[ranked[0]],
+        "mae": leaderboard[0]["mae"],
+        "folds": len(folds),
+        "leaderboard": leaderboard,
+        "tuned_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def main(df_features: pd.DataFrame = None) -> dict:
+    if df_features is None:
+        print("Loading features from the feature store")
+        df_features = load_features()
+
+    best = successive_halving(df_features)
+    for entry in best["leaderboard"][:5]:
+        print(f"  {entry['candidate']}  MAE {entry['mae']:.3f}  {entry['params']}")
+
+    path = params_path(ROOT, best["backend"])
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(best, indent=2), encoding="utf-8")
+    print(f"Saved tuned {best['backend']} params to {path} (MAE {best['mae']:.3f} over {best['folds']} folds)")
+    return best
+
+
+if __name__ == "__main__":
+    main()
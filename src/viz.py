@@ -1,20 +1,19 @@
 # src/viz.py
 
-from pathlib import Path
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from feature_store import read_dataset
 
-def load_anomalies(path: str):
-    return pd.read_csv(path)
+PLOT_COLS = ["PLAYER_NAME", "PTS", "PRED_PTS_NEXT_GAME", "RESIDUAL", "ABS_RESIDUAL", "ANOMALY_TYPE"]
 
 
-if __name__ == "__main__":
-    root = Path(__file__).resolve().parents[1]
-    anomalies_path = root / "data" / "processed" / "anomalies.csv"
+def load_anomalies(name: str = "anomalies"):
+    return read_dataset(name, columns=PLOT_COLS)
+
 
-    df = load_anomalies(str(anomalies_path))
+if __name__ == "__main__":
+    df = load_anomalies()
 
     # Plot 1: predicted vs actual scatter
     plt.figure(figsize=(7, 6))
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from sqlalchemy import text
+
+WATERMARKS_SQL = Path(__file__).resolve().parents[1] / "sql" / "02_layer_watermarks.sql"
+
+
+def ensure_watermarks(conn):
+    conn.execute(text(WATERMARKS_SQL.read_text(encoding="utf-8")))
+
+
+def get_watermark(conn, name: str):
+    """
+    Returns the last processed INGESTED_AT for an incremental layer,
+    or None if the layer has never been built.
+    """
+    return conn.execute(
+        text("SELECT watermark FROM gold.layer_watermarks WHERE name = :name;"),
+        {"name": name},
+    ).scalar()
+
+
+def set_watermark(conn, name: str, watermark):
+    conn.execute(text("""
+        INSERT INTO gold.layer_watermarks (name, watermark, updated_at)
+        VALUES (:name, :watermark, now())
+        ON CONFLICT (name)
+        DO UPDATE SET
+            watermark = EXCLUDED.watermark,
+            updated_at = EXCLUDED.updated_at;
+    """), {"name": name, "watermark": watermark})
+
+
+def reset_watermark(conn, name: str):
+    conn.execute(
+        text("DELETE FROM gold.layer_watermarks WHERE name = :name;"),
+        {"name": name},
+    )